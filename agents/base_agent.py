@@ -1,16 +1,105 @@
 import time
 import random
-from datetime import datetime
-from typing import List, Dict, Any
+import re
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 from model_interface.qwen_interface import get_qwen_model
 from model_interface.deepseek_api import get_deepseek_api
 from memory.memory_manager import get_memory_manager
-from config.settings import API_CONFIG
+from memory.embedding_service import get_embedding_service
+from memory.response_cache import SemanticResponseCache
+from config.settings import API_CONFIG, RESPONSE_CACHE_CONFIG, AVAILABLE_MOODS
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 任务复杂度关键词 - 预编译为单个正则，每组只需一次扫描
+# 复杂度关键词合并为一个带命名分组的正则，一次扫描得到全部命中类别
+# "详细"同时属于"需要分析"和"明确要求复杂回应"，单独成组
+_COMPLEXITY_RE = re.compile(
+    "(?P<both>详细)"
+    "|(?P<analysis>为什么|怎么办|分析|设计|介绍|发展|趋势)"  # 需要分析
+    "|(?P<creative>创作|创意|想象)"  # 创意任务
+    "|(?P<depth>复杂|深入|强化学习|算法|技术)"  # 明确要求复杂回应
+    "|(?P<question>[?？])"  # 问题类型
+)
+_COMPLEXITY_KEYWORD_CLASSES = 4
+
+# 社交互动中影响关系的关键词
+_POSITIVE_WORDS = ("你好", "谢谢", "很棒", "同意", "喜欢")
+_NEGATIVE_WORDS = ("不对", "讨厌", "烦人", "错误")
+# 正负面关键词合并为一个带命名分组的正则，一次扫描得到全部命中类别
+_SENTIMENT_RE = re.compile(
+    f"(?P<pos>{'|'.join(map(re.escape, _POSITIVE_WORDS))})|(?P<neg>{'|'.join(map(re.escape, _NEGATIVE_WORDS))})"
+)
+# 负面互动情境关键词（各角色prompt共用）
+_NEGATIVE_CONTEXT_RE = re.compile(
+    "|".join(map(re.escape, ('不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛')))
+)
+
+# 角色prompt中固定描述与可变状态的分界标记
+_PROMPT_STATE_MARKER = "当前状态："
+
+# 各角色共用的个性化prompt模板，角色差异只在开头、个性特点和结尾指令
+_PERSONA_PROMPT_TEMPLATE = (
+    "{header}\n\n个性特点：\n{traits}\n\n"
+    + _PROMPT_STATE_MARKER
+    + "\n- 位置: {location}\n- 心情: {mood}\n- 精力: {energy}%\n\n"
+    "最近记忆: {memories}\n当前情况: {context}\n\n{closing}"
+)
+
+# 个性化prompt缓存的最大条目数和有效期（秒）
+_PROMPT_CACHE_MAX = 64
+_PROMPT_CACHE_TTL = 60
+
+# 相关记忆检索缓存的最大条目数
+_MEMORY_CACHE_MAX = 128
+
+# 最近记忆拼接文本的有效期（秒），与记忆管理器的最近经历缓存一致
+_RECENT_TEXT_TTL = 60
+
+# 模型接口返回的错误提示前缀，这类回应不进入缓存
+_ERROR_RESPONSE_PREFIXES = (
+    "抱歉，AI系统暂时遇到了技术问题", "DeepSeek API密钥未设置",
+    "API请求失败", "API响应格式错误", "API调用失败",
+)
+
+# 记忆写入专用线程池，避免向量库写入占用对话/思考线程
+_MEMORY_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="AgentMemory")
+
+# 记忆检索专用线程池，与写入分开，预取相关记忆不会排在批量写入之后
+_MEMORY_READ_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="AgentMemoryRead")
+
+
+def shutdown_memory_executor(wait: bool = True):
+    """关闭记忆线程池，等待已提交的写入完成"""
+    _MEMORY_READ_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    _MEMORY_EXECUTOR.shutdown(wait=wait)
+
+
+@lru_cache(maxsize=256)
+def _make_api_header(name: str, profession: str, personality: str, background: str,
+                     location: str, mood: str, energy: int) -> str:
+    """生成API prompt的头部（身份+状态），这些字段变化很慢，按取值缓存"""
+    return f"""我是{name}，一名{profession}。
+
+个性特点：{personality}
+背景：{background}
+当前状态：在{location}，心情{mood}，精力{energy}%
+
+"""
+
+
 class BaseAgent:
+    # 角色专属prompt片段，由具体角色子类定义；为None时使用通用prompt
+    _PROMPT_HEADER = None
+    _PROMPT_TRAITS = ""
+    _PROMPT_NEGATIVE_CLOSING = ""
+    _PROMPT_POSITIVE_CLOSING = ""
+    
     def __init__(self, name: str, personality: str, background: str, profession: str = "通用"):
         self.name = name
         self.personality = personality#性格
@@ -19,7 +108,6 @@ class BaseAgent:
         
         # 状态信息
         self.current_location = "家"
-        self.location = "家"  # 兼容性属性
         self.current_mood = "平静"
         self.energy_level = 80
         
@@ -28,14 +116,28 @@ class BaseAgent:
         
         # 高级记忆系统
         self.memory_manager = get_memory_manager(self.name.lower())
+        self._memory_cache = OrderedDict()  # 相关记忆检索缓存（有界LRU）
+        self._prompt_cache = OrderedDict()  # 个性化prompt缓存（有界LRU）
+        self._recent_text_cache = (None, 0.0, "")  # 最近记忆拼接文本：(键, 时间, 文本)
         
         # 模型接口
         self.local_model = get_qwen_model()
         self.deepseek_api = get_deepseek_api() if API_CONFIG.get("use_api_fallback", False) else None
         
+        # 语义回应缓存：相似情境直接复用回应，跳过模型推理
+        self._embedding_service = get_embedding_service()
+        self._response_cache = (
+            SemanticResponseCache(self._embedding_service.get_dimension())
+            if RESPONSE_CACHE_CONFIG.get("enabled", False) else None
+        )
+        
         # 任务复杂度阈值 - 降低阈值让更多任务使用API
         self.complexity_threshold = 0.3
         
+        # 构造后不再变化的prompt片段，预先拼好
+        self._identity_prefix = f"我是{self.name}，一名{self.profession}，{self.personality}。"
+        self._reply_instruction = f"\n\n请直接以{self.name}的身份回应，只说你要说的话，不要解释或分析："
+        
         # 添加初始记忆
         self._initialize_memories()
         
@@ -43,21 +145,31 @@ class BaseAgent:
         if self.deepseek_api and self.deepseek_api.is_available():
             logger.info(f"{self.name} 具备DeepSeek高级推理能力")
     
+    @property
+    def location(self) -> str:
+        """兼容性属性，始终与current_location一致"""
+        return self.current_location
+    
+    @location.setter
+    def location(self, value: str):
+        self.current_location = value
+    
     def _initialize_memories(self):
-        """初始化基础记忆"""
-        # 添加基本身份记忆
-        self.memory_manager.add_memory(
-            content=f"我是{self.name}，一名{self.profession}。{self.background}",
-            memory_type="identity",
-            base_importance=0.9
-        )
-        
-        # 添加个性记忆
-        self.memory_manager.add_memory(
-            content=f"我的个性特点：{self.personality}",
-            memory_type="identity", 
-            base_importance=0.8
-        )
+        """初始化基础记忆（身份+个性，一次批量写入）"""
+        self.memory_manager.add_memories([
+            # 基本身份记忆
+            {
+                "content": f"我是{self.name}，一名{self.profession}。{self.background}",
+                "memory_type": "identity",
+                "base_importance": 0.9
+            },
+            # 个性记忆
+            {
+                "content": f"我的个性特点：{self.personality}",
+                "memory_type": "identity",
+                "base_importance": 0.8
+            },
+        ])
     
     def add_memory(self, memory: str, importance: int = 5, memory_type: str = "experience"):
         """添加记忆 (统一接口)"""
@@ -74,6 +186,16 @@ class BaseAgent:
         logger.debug(f"{self.name} 添加记忆: {memory}")
         return memory_id
     
+    def _add_memories_async(self, items: List[Dict]):
+        """在记忆专用线程池中批量添加记忆（一次批量编码 + 一次写入），不阻塞当前回应"""
+        if not items:
+            return None
+        try:
+            return _MEMORY_EXECUTOR.submit(self.memory_manager.add_memories, items)
+        except RuntimeError:
+            # 线程池已关闭（系统退出中），直接同步写入
+            return self.memory_manager.add_memories(items)
+    
     def get_recent_memories(self, count: int = 5) -> List[str]:
         """获取最近的记忆"""
         try:
@@ -85,14 +207,32 @@ class BaseAgent:
             logger.error(f"获取最近记忆失败: {e}")
             return []
     
+    def _cached_recent_text(self, count: int = 3) -> str:
+        """最近记忆拼接成的prompt文本：条数和记忆写入代数都未变化时直接复用，省去查询和拼接"""
+        key = (count, self.memory_manager.write_generation)
+        now = time.monotonic()
+        cached_key, cached_at, text = self._recent_text_cache
+        if cached_key == key and now - cached_at < _RECENT_TEXT_TTL:
+            return text
+        
+        recent_memories = self.get_recent_memories(count)
+        text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
+        self._recent_text_cache = (key, now, text)
+        return text
+    
     def retrieve_relevant_memories(self, context: str, limit: int = 3) -> List[str]:
         """检索与当前情况相关的记忆"""
         try:
             # 简单的本地缓存，避免频繁查询相同内容
-            cache_key = f"{context[:50]}_{limit}"
-            if hasattr(self, '_memory_cache') and cache_key in self._memory_cache:
-                cache_time, cached_memories = self._memory_cache[cache_key]
-                if time.time() - cache_time < 120:  # 2分钟缓存
+            # 用完整内容的摘要作键：前缀相同但内容不同的情境不会互相命中
+            cache_key = hashlib.blake2b(
+                context.strip().encode('utf-8'), digest_size=8, key=limit.to_bytes(2, 'little')
+            ).digest()
+            cached = self._memory_cache.get(cache_key)
+            if cached is not None:
+                cache_time, cached_memories = cached
+                if time.monotonic() - cache_time < 120:  # 2分钟缓存
+                    self._memory_cache.move_to_end(cache_key)
                     return cached_memories
             
             relevant_memories = self.memory_manager.retrieve_memories(
@@ -102,97 +242,205 @@ class BaseAgent:
             )
             result = [mem["content"] for mem in relevant_memories]
             
-            # 更新缓存
-            if not hasattr(self, '_memory_cache'):
-                self._memory_cache = {}
-            self._memory_cache[cache_key] = (time.time(), result)
+            # 更新缓存，超出容量时淘汰最久未用的条目
+            self._memory_cache[cache_key] = (time.monotonic(), result)
+            self._memory_cache.move_to_end(cache_key)
+            if len(self._memory_cache) > _MEMORY_CACHE_MAX:
+                self._memory_cache.popitem(last=False)
             
             return result
         except Exception as e:
             logger.error(f"检索相关记忆失败: {e}")
             return self.get_recent_memories(limit)
     
+    @staticmethod
+    def _is_negative_context(context: str) -> bool:
+        """情境是否为负面互动（一次正则扫描）"""
+        return _NEGATIVE_CONTEXT_RE.search(context) is not None
+    
     def build_personality_prompt(self, context: str) -> str:
-        """构建更自然的个性化prompt"""
-        # 检测是否是负面互动，如果是则添加特殊指令
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
+        """构建更自然的个性化prompt（角色子类共用同一模板，按互动正负面选择结尾指令）"""
+        if self._PROMPT_HEADER is None:
+            # 负面互动的指令已包含在context中，正负面使用同一模板
+            return self._identity_prefix + context + self._reply_instruction
         
-        if is_negative_interaction:
-            # 负面互动时，强制保持负面，不允许缓解气氛
-            prompt = f"""我是{self.name}，一名{self.profession}，{self.personality}。{context}
-
-请直接以{self.name}的身份回应，只说你要说的话，不要解释或分析："""
-        else:
-            # 正常互动
-            prompt = f"""我是{self.name}，一名{self.profession}，{self.personality}。{context}
-
-请直接以{self.name}的身份回应，只说你要说的话，不要解释或分析："""
-        return prompt
+        closing = (self._PROMPT_NEGATIVE_CLOSING if self._is_negative_context(context)
+                   else self._PROMPT_POSITIVE_CLOSING)
+        return _PERSONA_PROMPT_TEMPLATE.format(
+            header=self._PROMPT_HEADER, traits=self._PROMPT_TRAITS,
+            location=self.current_location, mood=self.current_mood, energy=self.energy_level,
+            memories=self._cached_recent_text(3), context=context, closing=closing
+        )
+    
+    @staticmethod
+    def _complexity_keyword_hits(situation: str) -> int:
+        """一次扫描统计命中的关键词类别数（需要分析/创意/复杂回应/问题）"""
+        hits = set()
+        for match in _COMPLEXITY_RE.finditer(situation):
+            if match.lastgroup == "both":
+                hits.update(("analysis", "depth"))
+            else:
+                hits.add(match.lastgroup)
+            if len(hits) == _COMPLEXITY_KEYWORD_CLASSES:
+                break
+        return len(hits)
     
     def analyze_task_complexity(self, situation: str) -> float:
         """分析任务复杂度"""
-        complexity_indicators = [
-            len(situation.split()) > 15,  # 降低长文本阈值
-            any(word in situation for word in ["为什么", "怎么办", "分析", "设计", "介绍", "详细", "发展", "趋势"]),  # 需要分析
-            any(word in situation for word in ["创作", "创意", "想象"]),  # 创意任务
-            any(word in situation for word in ["复杂", "深入", "详细", "强化学习", "算法", "技术"]),  # 明确要求复杂回应
-            "?" in situation or "？" in situation,  # 问题类型
-        ]
+        hits = self._complexity_keyword_hits(situation)
+        if len(situation.split()) > 15:  # 降低长文本阈值
+            hits += 1
         
-        complexity = sum(complexity_indicators) / len(complexity_indicators)
+        complexity = hits / (_COMPLEXITY_KEYWORD_CLASSES + 1)
         logger.debug(f"任务复杂度分析: {situation[:30]}... -> {complexity}")
         return complexity
     
+    def _is_complex(self, situation: str) -> bool:
+        """
+        判断任务复杂度是否超过阈值，与 analyze_task_complexity() > complexity_threshold 等价，
+        关键词结论已确定时不再做长文本分词
+        """
+        # 复杂度 = 命中数 / 指标数，需要命中数严格大于 needed
+        needed = self.complexity_threshold * (_COMPLEXITY_KEYWORD_CLASSES + 1)
+        hits = self._complexity_keyword_hits(situation)
+        if hits > needed:
+            return True
+        if hits + 1 <= needed:
+            return False
+        return len(situation.split()) > 15
+    
+    def _api_available(self) -> bool:
+        """高级模型是否可用（API实例内部按TTL缓存探测结果）"""
+        return self.deepseek_api is not None and self.deepseek_api.is_available()
+    
     def should_use_advanced_model(self, situation: str) -> bool:
         """判断是否需要使用高级模型"""
-        # 检查是否有可用的高级模型
-        if not self.deepseek_api or not self.deepseek_api.is_available():
+        # 先做本地的复杂度判断，简单任务不必触发可用性探测
+        if not self._is_complex(situation):
             return False
         
-        complexity = self.analyze_task_complexity(situation)
-        return complexity > self.complexity_threshold
+        # 检查是否有可用的高级模型
+        return self._api_available()
     
-    def think_and_respond(self, situation: str) -> str:
-        """思考并回应情况"""
+    def think_and_respond(self, situation: str, use_cache: bool = False) -> str:
+        """
+        思考并回应情况
+        Args:
+            situation: 当前情况
+            use_cache: 是否使用语义回应缓存（只适合用户对话；模拟中的重试和思考需要新的回应）
+        """
+        response, pending_memories = self._respond(situation, use_cache)
+        self._add_memories_async(pending_memories)
+        return response
+    
+    def _respond(self, situation: str, use_cache: bool = False) -> Tuple[str, List[Dict]]:
+        """生成回应，并返回待写入的记忆条目（由调用方统一批量写入）"""
         try:
-            # 智能路由：根据复杂度选择模型
-            if self.should_use_advanced_model(situation):
+            # 智能路由：根据复杂度选择模型（可用性有缓存，判断本身很便宜）
+            use_advanced = self.should_use_advanced_model(situation)
+            
+            # 高级推理需要相关记忆：检索（嵌入+向量搜索）与下面的语义缓存查找并行进行
+            memories_future = None
+            if use_advanced:
+                try:
+                    memories_future = _MEMORY_READ_EXECUTOR.submit(self.retrieve_relevant_memories, situation, 3)
+                except RuntimeError:
+                    memories_future = None  # 线程池已关闭，稍后同步检索
+            
+            # 相似情境（且地点、心情相同）直接复用之前的回应
+            embedding = None
+            cached = None
+            cache_tag = (self.current_location, self.current_mood)
+            if use_cache and self._response_cache is not None:
+                embedding = self._embedding_service.encode_single(situation)
+                cached = self._response_cache.lookup(embedding, tag=cache_tag)
+            
+            if cached is not None:
+                logger.debug(f"{self.name} 命中语义回应缓存")
+                if memories_future is not None:
+                    memories_future.cancel()
+                response = cached
+            elif use_advanced:
                 logger.debug(f"{self.name} 使用DeepSeek高级推理")
-                response = self._advanced_thinking_with_api(situation)
+                memories = memories_future.result() if memories_future is not None else None
+                # 路由时已确认API可用，不再重复检查
+                response = self._advanced_thinking_with_api(situation, memories, api_available=True)
             else:
                 logger.debug(f"{self.name} 使用本地模型回应")
                 response = self._simple_thinking(situation)
             
-            # 记录这次交互
-            memory_content = f"面对'{situation}'时，我回应：{response}"
-            self.add_memory(memory_content, importance=6, memory_type="experience")
+            if cached is None and embedding is not None and not response.startswith(_ERROR_RESPONSE_PREFIXES):
+                self._response_cache.store(embedding, response, tag=cache_tag)
             
-            return response
+            # 记录这次交互（命中缓存时同样记录）
+            pending_memories = [{
+                "content": f"面对'{situation}'时，我回应：{response}",
+                "memory_type": "experience",
+                "base_importance": 0.6,
+            }]
+            
+            return response, pending_memories
             
         except Exception as e:
             logger.error(f"{self.name} 回应时出错: {e}")
-            return f"*{self.name}似乎在思考什么，暂时没有说话*"
+            return f"*{self.name}似乎在思考什么，暂时没有说话*", []
+    
+    def _get_personality_prompt(self, situation: str) -> str:
+        """
+        获取个性化prompt：情境和状态（地点、心情、精力、记忆写入代数）都未变化时
+        直接复用上次构建的结果，省去最近记忆查询和模板拼接
+        """
+        cache_key = (
+            situation, self.current_location, self.current_mood, self.energy_level,
+            self.memory_manager.write_generation
+        )
+        now = time.monotonic()
+        cached = self._prompt_cache.get(cache_key)
+        if cached is not None and now - cached[0] < _PROMPT_CACHE_TTL:
+            self._prompt_cache.move_to_end(cache_key)
+            return cached[1]
+        
+        prompt = self.build_personality_prompt(situation)
+        self._prompt_cache[cache_key] = (now, prompt)
+        self._prompt_cache.move_to_end(cache_key)
+        if len(self._prompt_cache) > _PROMPT_CACHE_MAX:
+            self._prompt_cache.popitem(last=False)
+        return prompt
     
     def _simple_thinking(self, situation: str) -> str:
         """简单思考模式 - 使用本地模型"""
-        prompt = self.build_personality_prompt(situation)
+        prompt = self._get_personality_prompt(situation)
+        
+        # 角色prompt在"当前状态："之前是固定的身份与个性描述，交给本地模型缓存其KV，
+        # 每次只需处理状态、记忆和情境部分
+        static_part, marker, dynamic_part = prompt.partition(_PROMPT_STATE_MARKER)
+        if marker:
+            return self.local_model.chat_with_prefix(static_part, marker + dynamic_part, max_tokens=120)
+        if prompt.startswith(self._identity_prefix):
+            return self.local_model.chat_with_prefix(
+                self._identity_prefix, prompt[len(self._identity_prefix):], max_tokens=120
+            )
         return self.local_model.chat(prompt, max_tokens=120)  # 从800降到120
     
-    def _advanced_thinking_with_api(self, situation: str) -> str:
-        """高级思考模式 - 使用DeepSeek API"""
-        if not self.deepseek_api or not self.deepseek_api.is_available():
+    def _advanced_thinking_with_api(self, situation: str, memories: List[str] = None,
+                                    api_available: bool = None) -> str:
+        """高级思考模式 - 使用DeepSeek API（memories 为预先检索好的相关记忆）"""
+        if api_available is None:
+            api_available = self._api_available()
+        if not api_available:
             # 回退到本地模型
             return self._advanced_thinking_local(situation)
         
-        # 构建更自然的prompt用于API
-        enhanced_prompt = f"""我是{self.name}，一名{self.profession}。
-
-个性特点：{self.personality}
-背景：{self.background}
-当前状态：在{self.current_location}，心情{self.current_mood}，精力{self.energy_level}%
-
-相关经历：{self.retrieve_relevant_memories(situation, limit=3)}
+        # 构建更自然的prompt用于API：头部按状态缓存，只拼接变化的尾部
+        header = _make_api_header(
+            self.name, self.profession, self.personality, self.background,
+            self.current_location, self.current_mood, self.energy_level
+        )
+        if memories is None:
+            memories = self.retrieve_relevant_memories(situation, limit=3)
+        # 逐条换行列出，而不是把列表的repr（带引号和转义）塞进prompt
+        memory_block = "\n- " + "\n- ".join(memories) if memories else "无"
+        enhanced_prompt = header + f"""相关经历：{memory_block}
 
 现在面对的情况：{situation}
 
@@ -202,60 +450,50 @@ class BaseAgent:
     
     def _advanced_thinking_local(self, situation: str) -> str:
         """高级思考模式 - 本地模型备用"""
-        prompt = f"""我是{self.name}，一名{self.profession}，{self.personality}。{situation}
-
-请直接以{self.name}的身份回应，只说你要说的话，不要分析或解释："""
-        return self.local_model.chat(prompt, max_tokens=150)  # 从800降到150
+        # 身份前缀固定不变，由本地模型缓存其KV，只需处理情境部分
+        return self.local_model.chat_with_prefix(
+            self._identity_prefix, situation + self._reply_instruction, max_tokens=150
+        )  # 从800降到150
     
     def interact_with(self, other_agent, message: str) -> str:
         """与另一个Agent交互"""
+        name = other_agent.name
+        relationships = self.relationships
+        
         # 构建社交情境
         relationship_context = ""
-        if other_agent.name in self.relationships:
-            relationship_level = self.relationships[other_agent.name]
+        relationship_level = relationships.get(name)
+        if relationship_level is not None:
             if relationship_level > 70:
-                relationship_context = f"我和{other_agent.name}是好朋友"
+                relationship_context = f"我和{name}是好朋友"
             elif relationship_level > 50:
-                relationship_context = f"我对{other_agent.name}有好感"
+                relationship_context = f"我对{name}有好感"
             elif relationship_level < 30:
-                relationship_context = f"我对{other_agent.name}不太熟悉"
-        
-        situation = f"{other_agent.name}对我说：'{message}'。{relationship_context}"
-        response = self.think_and_respond(situation)
+                relationship_context = f"我对{name}不太熟悉"
         
-        # 更新关系
-        if other_agent.name not in self.relationships:
-            self.relationships[other_agent.name] = 50
+        situation = f"{name}对我说：'{message}'。{relationship_context}"
+        response, pending_memories = self._respond(situation)
         
-        # 根据交互内容微调关系
-        positive_words = ["你好", "谢谢", "很棒", "同意", "喜欢"]
-        negative_words = ["不对", "讨厌", "烦人", "错误"]
-        
-        if any(word in message.lower() for word in positive_words):
-            self.relationships[other_agent.name] += 5
-        elif any(word in message.lower() for word in negative_words):
-            self.relationships[other_agent.name] -= 3
-        
-        # 限制关系值范围
-        self.relationships[other_agent.name] = max(0, min(100, self.relationships[other_agent.name]))
+        # 更新关系：根据交互内容微调，并限制关系值范围
+        hits = {match.lastgroup for match in _SENTIMENT_RE.finditer(message)}
+        delta = 5 if "pos" in hits else -3 if "neg" in hits else 0
+        relationship_level = max(0, min(100, relationships.get(name, 50) + delta))
+        relationships[name] = relationship_level
         
         # 记录社交互动
-        social_memory = f"与{other_agent.name}的对话：他们说'{message}'，我回应'{response}'，关系度：{self.relationships[other_agent.name]}"
-        self.add_memory(social_memory, importance=7, memory_type="social")
+        pending_memories.append({
+            "content": f"与{name}的对话：他们说'{message}'，我回应'{response}'，关系度：{relationship_level}",
+            "memory_type": "social",
+            "base_importance": 0.7,
+        })
+        # 经历记忆与社交记忆一次批量编码、一次写入
+        self._add_memories_async(pending_memories)
         
         return response
     
     def update_status(self):
         """更新Agent状态"""
-        # 同步location属性
-        if hasattr(self, 'location') and self.location != self.current_location:
-            self.current_location = self.location
-        elif hasattr(self, 'current_location') and not hasattr(self, 'location'):
-            self.location = self.current_location
-        
         # 随机变化心情和精力
-        from config.settings import AVAILABLE_MOODS
-        
         if random.random() < 0.3:  # 30%概率改变心情
             self.current_mood = random.choice(AVAILABLE_MOODS)
         
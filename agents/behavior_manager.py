@@ -5,24 +5,236 @@ AI Agent行为管理器
 
 import random
 import time
-import json
-import sys
 import os
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 import logging
+from functools import lru_cache
+from types import MappingProxyType
+import numpy as np
 
-# 添加配置路径
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.persistence_manager import write_json, read_json
 from config.relationship_config import (
     RELATIONSHIP_LEVELS, INTERACTION_EFFECTS, RELATIONSHIP_DECAY,
-    PERSONALITY_MODIFIERS, PROFESSION_COMPATIBILITY, LOCATION_EFFECTS,
-    RELATIONSHIP_CHANGE_MESSAGES, get_relationship_level, 
-    calculate_interaction_effect
+    PERSONALITY_MODIFIERS, PROFESSION_PAIR_COMPATIBILITY, LOCATION_INTERACTION_MODIFIERS,
+    LEVEL_CHANGE_MESSAGES, get_relationship_level,
+    calculate_interaction_effect_flags, FLAG_SAME_LOCATION, FLAG_SAME_PROFESSION,
+    FLAG_FIRST_INTERACTION, FLAG_PRIVATE_LOCATION, FLAG_HIGH_RELATIONSHIP
 )
 
 logger = logging.getLogger(__name__)
 
+
+# 按整数关系强度(0~100)预先查好的衰减率，衰减时直接向量化索引
+_DECAY_RATE_LUT = np.array([
+    RELATIONSHIP_DECAY['decay_intervals'].get(get_relationship_level(strength), 0.5)
+    for strength in range(101)
+])
+
+# 批量向量化抽样使用的随机数生成器（关系衰减、社交网络与地点热度初始化）
+_RNG = np.random.default_rng()
+
+# 自动初始化社交网络时的关系分档：累计概率分界、各档分数范围（闭区间）
+# 好友 / 普通 / 不太喜欢 / 敌对
+_INIT_TIER_CUTOFFS = np.array([0.3, 0.7, 0.9])
+_INIT_TIER_LOW = np.array([60, 40, 20, 10])
+_INIT_TIER_HIGH = np.array([80, 60, 40, 20])
+
+# 对话话题（模块级只读常量，不随管理器实例重复创建）
+_CONVERSATION_TOPICS = {
+    'casual': (
+        "今天天气不错啊", "最近过得怎么样", "这个地方真不错",
+        "你最近在忙什么", "有什么新鲜事吗", "周末有什么计划"
+    ),
+    'professional': (
+        "工作上最近有什么挑战", "你对这个领域的看法如何",
+        "最近学到了什么新东西", "有什么好的工作建议吗"
+    ),
+    'personal': (
+        "你的兴趣爱好是什么", "最近读了什么好书",
+        "有什么让你开心的事", "你的梦想是什么"
+    ),
+    'community': (
+        "小镇最近的变化真大", "我们应该组织一个活动",
+        "这里的人都很友善", "你觉得这里还需要什么改进"
+    )
+}
+
+# 话题类型的概率分布：(关系档位, 是否同职业) -> (话题类型, 累计权重)
+# 关系档位：0 = 关系<30，只聊日常；1 = 30~69，日常/职业各半；2 = 70以上，个人/社区/职业均分
+# 同职业时有30%概率改聊职业话题
+def _topic_type_distribution(tier: int, same_profession: bool) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+    probabilities = (
+        {'casual': 1.0},
+        {'professional': 0.5, 'casual': 0.5},
+        {'personal': 1 / 3, 'community': 1 / 3, 'professional': 1 / 3},
+    )[tier]
+    if same_profession:
+        probabilities = {topic_type: p * 0.7 for topic_type, p in probabilities.items()}
+        probabilities['professional'] = probabilities.get('professional', 0.0) + 0.3
+    cum_weights = tuple(np.cumsum(list(probabilities.values())).tolist())
+    return tuple(probabilities), cum_weights
+
+_TOPIC_TYPE_DISTRIBUTIONS = {
+    (tier, same_profession): _topic_type_distribution(tier, same_profession)
+    for tier in range(3)
+    for same_profession in (False, True)
+}
+
+# 心情兴奋/快乐时随机探索的地点
+_EXPLORE_LOCATIONS = ('咖啡厅', '图书馆', '公园')
+
+# 群体活动模板（只读，使用时复制）
+_GROUP_ACTIVITIES = (
+    MappingProxyType({
+        'name': '小镇聚会',
+        'location': '公园',
+        'duration': 30,
+        'description': '大家聚在一起聊天，分享最近的生活'
+    }),
+    MappingProxyType({
+        'name': '读书会',
+        'location': '图书馆', 
+        'duration': 45,
+        'description': '讨论最近读的书籍和学习心得'
+    }),
+    MappingProxyType({
+        'name': '咖啡时光',
+        'location': '咖啡厅',
+        'duration': 20,
+        'description': '在轻松的氛围中交流想法'
+    }),
+    MappingProxyType({
+        'name': '技术交流',
+        'location': '办公室',
+        'duration': 35,
+        'description': '分享工作经验和专业知识'
+    })
+)
+
+# 小镇事件模板（只读，使用时复制）
+_TOWN_EVENTS = (
+    MappingProxyType({
+        'name': '小镇集市',
+        'description': '每周的集市开始了，大家都来买东西',
+        'location': '公园',
+        'duration': 60,
+        'effect': '增加公园的人气'
+    }),
+    MappingProxyType({
+        'name': '技术讲座',
+        'description': '在图书馆举办的技术分享会',
+        'location': '图书馆',
+        'duration': 45,
+        'effect': '程序员和学生更愿意参加'
+    }),
+    MappingProxyType({
+        'name': '艺术展览',
+        'description': '本地艺术家的作品展示',
+        'location': '咖啡厅',
+        'duration': 90,
+        'effect': '艺术家们聚集交流'
+    }),
+    MappingProxyType({
+        'name': '健康检查日',
+        'description': '免费的健康检查活动',
+        'location': '办公室',
+        'duration': 120,
+        'effect': '大家关注健康话题'
+    })
+)
+
+# 各职业的日程模板（只读共享）
+_PROFESSION_SCHEDULES = {
+    '程序员': {
+        'morning': (
+            MappingProxyType({'time': '9:00', 'activity': '在咖啡厅喝咖啡思考', 'location': '咖啡厅'}),
+            MappingProxyType({'time': '9:30', 'activity': '开始编程工作', 'location': '办公室'})
+        ),
+        'afternoon': (
+            MappingProxyType({'time': '14:00', 'activity': '代码审查和调试', 'location': '办公室'}),
+            MappingProxyType({'time': '16:00', 'activity': '在公园散步思考算法', 'location': '公园'})
+        ),
+        'evening': (
+            MappingProxyType({'time': '18:00', 'activity': '回家休息', 'location': '家'}),
+            MappingProxyType({'time': '20:00', 'activity': '阅读技术文档', 'location': '图书馆'})
+        ),
+    },
+    '艺术家': {
+        'morning': (
+            MappingProxyType({'time': '8:00', 'activity': '在公园寻找灵感', 'location': '公园'}),
+            MappingProxyType({'time': '10:00', 'activity': '在咖啡厅素描', 'location': '咖啡厅'})
+        ),
+        'afternoon': (
+            MappingProxyType({'time': '14:00', 'activity': '回家创作', 'location': '家'}),
+            MappingProxyType({'time': '16:00', 'activity': '整理作品', 'location': '家'})
+        ),
+        'evening': (
+            MappingProxyType({'time': '18:00', 'activity': '在咖啡厅展示作品', 'location': '咖啡厅'}),
+            MappingProxyType({'time': '20:00', 'activity': '参加艺术交流', 'location': '公园'})
+        ),
+    },
+    '老师': {
+        'morning': (
+            MappingProxyType({'time': '8:00', 'activity': '在图书馆备课', 'location': '图书馆'}),
+            MappingProxyType({'time': '9:00', 'activity': '准备教学材料', 'location': '办公室'})
+        ),
+        'afternoon': (
+            MappingProxyType({'time': '14:00', 'activity': '批改作业', 'location': '办公室'}),
+            MappingProxyType({'time': '16:00', 'activity': '与同事讨论', 'location': '咖啡厅'})
+        ),
+        'evening': (
+            MappingProxyType({'time': '18:00', 'activity': '回家休息', 'location': '家'}),
+            MappingProxyType({'time': '19:00', 'activity': '阅读教育书籍', 'location': '图书馆'})
+        ),
+    }
+}
+
+# 其他职业使用的通用日程
+_DEFAULT_SCHEDULE = {
+    'morning': (
+        MappingProxyType({'time': '9:00', 'activity': '开始工作', 'location': '办公室'}),
+        MappingProxyType({'time': '10:30', 'activity': '短暂休息', 'location': '咖啡厅'})
+    ),
+    'afternoon': (
+        MappingProxyType({'time': '14:00', 'activity': '继续工作', 'location': '办公室'}),
+        MappingProxyType({'time': '16:00', 'activity': '户外活动', 'location': '公园'})
+    ),
+    'evening': (
+        MappingProxyType({'time': '18:00', 'activity': '回家', 'location': '家'}),
+        MappingProxyType({'time': '20:00', 'activity': '个人时间', 'location': '家'})
+    ),
+}
+# 各职业偏好的地点（推荐地点时使用）
+_PROFESSION_LOCATION_PREFERENCES = {
+    '程序员': ('办公室', '咖啡厅', '图书馆'),
+    '艺术家': ('公园', '咖啡厅', '家'),
+    '老师': ('图书馆', '办公室', '咖啡厅'),
+    '学生': ('图书馆', '咖啡厅', '公园'),
+    '商人': ('办公室', '咖啡厅'),
+    '退休人员': ('公园', '家', '咖啡厅'),
+    '医生': ('医院', '办公室', '咖啡厅'),
+    '厨师': ('餐厅', '咖啡厅', '家'),
+    '机械师': ('修理店', '办公室', '家'),
+}
+_DEFAULT_LOCATION_PREFERENCES = ('公园', '咖啡厅')
+
+# 不同类型的Agent（BaseAgent / TerminalAgent）属性名不同：按类型解析一次实际使用的属性名
+_AGENT_ATTR_NAMES = {}
+
+def _agent_attr(agent, names: Tuple[str, ...], default):
+    """按候选属性名顺序读取Agent属性，命中的属性名按Agent类型缓存，避免每次逐个hasattr探测"""
+    key = (type(agent), names)
+    name = _AGENT_ATTR_NAMES.get(key)
+    if name is None:
+        name = next((n for n in names if hasattr(agent, n)), "")
+        _AGENT_ATTR_NAMES[key] = name
+    return getattr(agent, name, default) if name else default
+
+_LOCATION_ATTRS = ('current_location', 'location')
+_ENERGY_ATTRS = ('energy_level', 'energy')
+_MOOD_ATTRS = ('current_mood', 'mood')
+
 class AgentBehaviorManager:
     """Agent行为管理器"""
     
@@ -30,31 +242,15 @@ class AgentBehaviorManager:
         self.social_network = {}  # 社交网络图
         self.group_activities = []  # 群体活动
         self.town_events = []  # 小镇事件
+        self._active_events_by_location = {}  # 地点 -> 进行中的事件（按开始顺序）
         self.agent_schedules = {}  # Agent日程安排
         self.location_popularity = {}  # 地点热度
-        self.conversation_topics = self._init_conversation_topics()
-        
-    def _init_conversation_topics(self) -> Dict[str, List[str]]:
-        """初始化对话话题"""
-        return {
-            'casual': [
-                "今天天气不错啊", "最近过得怎么样", "这个地方真不错",
-                "你最近在忙什么", "有什么新鲜事吗", "周末有什么计划"
-            ],
-            'professional': [
-                "工作上最近有什么挑战", "你对这个领域的看法如何",
-                "最近学到了什么新东西", "有什么好的工作建议吗"
-            ],
-            'personal': [
-                "你的兴趣爱好是什么", "最近读了什么好书",
-                "有什么让你开心的事", "你的梦想是什么"
-            ],
-            'community': [
-                "小镇最近的变化真大", "我们应该组织一个活动",
-                "这里的人都很友善", "你觉得这里还需要什么改进"
-            ]
-        }
-    
+        self._social_dirty = False  # 社交网络或地点热度自上次落盘后是否有变更（二者存在同一文件中）
+        self._edge_index = None  # 社交网络的CSR边数组视图，按需重建
+        self._last_decay_time = None  # 上次关系衰减的单调时钟时间
+        self._clock_minute = -1  # 缓存的"HH:MM"对应的分钟数（epoch分钟）
+        self._clock_text = ""
+        
     def update_social_network(self, agent1_name: str, agent2_name: str, 
                              interaction_type: str, context: dict = None) -> dict:
         """
@@ -71,60 +267,61 @@ class AgentBehaviorManager:
         old_strength = self.social_network[agent1_name].get(agent2_name, 50)
         old_level = get_relationship_level(old_strength)
         
-        # 构建互动条件
-        conditions = {}
+        # 构建互动条件（位掩码）
+        flags = 0
         if context:
             # 检查各种条件
             if context.get('same_location'):
-                conditions['同地点'] = True
+                flags |= FLAG_SAME_LOCATION
             if context.get('same_profession'):
-                conditions['相同职业'] = True
+                flags |= FLAG_SAME_PROFESSION
             if context.get('first_interaction'):
-                conditions['首次交流'] = True
+                flags |= FLAG_FIRST_INTERACTION
             if context.get('private_location'):
-                conditions['私密场所'] = True
+                flags |= FLAG_PRIVATE_LOCATION
             if old_strength >= 60:
-                conditions['高关系基础'] = True
+                flags |= FLAG_HIGH_RELATIONSHIP
         
         # 计算关系变化
-        change, effect_details = calculate_interaction_effect(interaction_type, conditions)
+        change, effect_details = calculate_interaction_effect_flags(interaction_type, flags)
         
         # 应用专业相性修正 - 负面互动限制修正幅度
         if context and 'agent1_profession' in context and 'agent2_profession' in context:
-            prof1 = context['agent1_profession']
-            prof2 = context['agent2_profession']
-            if prof1 in PROFESSION_COMPATIBILITY and prof2 in PROFESSION_COMPATIBILITY[prof1]:
-                compatibility = PROFESSION_COMPATIBILITY[prof1][prof2]
-                if compatibility != 1.0:
-                    # 负面互动限制修正幅度，避免过度抵消
-                    if change < 0 and compatibility > 1.0:
-                        # 负面互动时，好的职业相性最多减少10%的扣分
-                        compatibility = max(0.9, compatibility)
-                    change = int(change * compatibility)
-                    effect_details += f" | 职业相性: ×{compatibility}"
+            compatibility = PROFESSION_PAIR_COMPATIBILITY.get(
+                (context['agent1_profession'], context['agent2_profession']), 1.0)
+            if compatibility != 1.0:
+                # 负面互动限制修正幅度，避免过度抵消
+                if change < 0 and compatibility > 1.0:
+                    # 负面互动时，好的职业相性最多减少10%的扣分
+                    compatibility = max(0.9, compatibility)
+                change = int(change * compatibility)
+                effect_details += f" | 职业相性: ×{compatibility}"
         
         # 应用地点加成 - 负面互动限制修正幅度
         if context and 'location' in context:
             location = context['location']
-            if location in LOCATION_EFFECTS:
-                location_effect = LOCATION_EFFECTS[location]
-                if interaction_type in location_effect:
-                    modifier = location_effect[interaction_type]
-                    # 负面互动时，地点加成最多减少20%的扣分
-                    if change < 0 and modifier > 1.0:
-                        modifier = max(0.8, modifier)
-                    change = int(change * modifier)
-                    effect_details += f" | 地点加成({location}): ×{modifier}"
-        
-        # 计算新的关系强度
+            modifier = LOCATION_INTERACTION_MODIFIERS.get((location, interaction_type))
+            if modifier is not None:
+                # 负面互动时，地点加成最多减少20%的扣分
+                if change < 0 and modifier > 1.0:
+                    modifier = max(0.8, modifier)
+                change = int(change * modifier)
+                effect_details += f" | 地点加成({location}): ×{modifier}"
+        
+        # 计算新的关系强度（强度不变时等级也不变，无需重新计算）
         new_strength = max(0, min(100, old_strength + change))
-        new_level = get_relationship_level(new_strength)
+        new_level = old_level if new_strength == old_strength else get_relationship_level(new_strength)
         
-        # 更新关系
-        self.social_network[agent1_name][agent2_name] = new_strength
-        self.social_network[agent2_name][agent1_name] = new_strength
+        # 更新关系（两个方向都已是新值时不产生写入，避免无谓的落盘和边数组重建）
+        if (self.social_network[agent1_name].get(agent2_name) != new_strength
+                or self.social_network[agent2_name].get(agent1_name) != new_strength):
+            self.social_network[agent1_name][agent2_name] = new_strength
+            self.social_network[agent2_name][agent1_name] = new_strength
+            self._social_dirty = True
+            self._edge_index = None
         
         # 准备返回信息
+        level_info = RELATIONSHIP_LEVELS[new_level]
         result = {
             'old_strength': old_strength,
             'new_strength': new_strength,
@@ -133,152 +330,164 @@ class AgentBehaviorManager:
             'new_level': new_level,
             'level_changed': old_level != new_level,
             'effect_details': effect_details,
-            'relationship_emoji': RELATIONSHIP_LEVELS[new_level]['emoji'],
-            'relationship_desc': RELATIONSHIP_LEVELS[new_level]['description']
+            'relationship_emoji': level_info['emoji'],
+            'relationship_desc': level_info['description']
         }
         
         # 添加等级变化消息
         if result['level_changed']:
-            if new_strength > old_strength:
-                change_key = f"{old_level}→{new_level}"
-                if change_key in RELATIONSHIP_CHANGE_MESSAGES['升级']:
-                    result['level_change_message'] = RELATIONSHIP_CHANGE_MESSAGES['升级'][change_key]
-            else:
-                change_key = f"{old_level}→{new_level}"
-                if change_key in RELATIONSHIP_CHANGE_MESSAGES['降级']:
-                    result['level_change_message'] = RELATIONSHIP_CHANGE_MESSAGES['降级'][change_key]
+            message = LEVEL_CHANGE_MESSAGES.get((old_level, new_level))
+            if message is not None:
+                result['level_change_message'] = message
         
-        logger.debug(f"关系更新: {agent1_name} ↔ {agent2_name}: {old_strength}→{new_strength} ({effect_details})")
+        # 每次互动都会调用，使用惰性格式化，未开启debug时不拼接字符串
+        logger.debug("关系更新: %s ↔ %s: %s→%s (%s)",
+                     agent1_name, agent2_name, old_strength, new_strength, effect_details)
         
         return result
     
+    def update_social_network_batch(self, updates: List[Tuple]) -> List[dict]:
+        """
+        批量更新社交网络（按顺序逐条应用，同一对Agent的多次互动会依次叠加）
+        Args:
+            updates: (agent1_name, agent2_name, interaction_type, context) 元组列表，context可省略
+        Returns:
+            与updates顺序一致的关系变化信息列表
+        """
+        update = self.update_social_network
+        return [update(*item) for item in updates]
+    
     def get_relationship_strength(self, agent1_name: str, agent2_name: str) -> int:
         """获取两个Agent的关系强度"""
         return self.social_network.get(agent1_name, {}).get(agent2_name, 50)
     
+    def get_relationship_strengths(self, agent_name: str, other_names: List[str]) -> List[int]:
+        """批量获取一个Agent与多个Agent的关系强度（只取一次该Agent的关系行）"""
+        relationships = self.social_network.get(agent_name, {})
+        return [relationships.get(other_name, 50) for other_name in other_names]
+    
+    def set_relationship_strength(self, agent1_name: str, agent2_name: str, strength: int):
+        """直接设置两个Agent的关系强度（双向），只更新内存并标记待保存"""
+        self.social_network.setdefault(agent1_name, {})[agent2_name] = strength
+        self.social_network.setdefault(agent2_name, {})[agent1_name] = strength
+        self._social_dirty = True
+        self._edge_index = None
+    
+    def _get_edge_index(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        社交网络的CSR边数组视图（names, row_ptr, col_idx, weights），社交网络变更后按需重建
+        第i个Agent的关系为 col_idx[row_ptr[i]:row_ptr[i+1]]，Agent按名字排序
+        """
+        if self._edge_index is None:
+            names = sorted(set(self.social_network).union(*self.social_network.values()))
+            index = {name: i for i, name in enumerate(names)}
+            row_ptr = [0]
+            col_idx = []
+            weights = []
+            for name in names:
+                for other_name, strength in self.social_network.get(name, {}).items():
+                    col_idx.append(index[other_name])
+                    weights.append(strength)
+                row_ptr.append(len(col_idx))
+            self._edge_index = (
+                names,
+                np.array(row_ptr, dtype=np.int64),
+                np.array(col_idx, dtype=np.int64),
+                np.array(weights, dtype=np.float64),
+            )
+        return self._edge_index
+    
+    def _upper_edges(self):
+        """每对关系只取一次（按名字排序后 行 < 列 的那条边）"""
+        names, row_ptr, col_idx, weights = self._get_edge_index()
+        rows = np.repeat(np.arange(len(names)), np.diff(row_ptr))
+        upper = col_idx > rows
+        return names, rows[upper], col_idx[upper], weights[upper]
+    
     def apply_relationship_decay(self):
         """应用关系衰减 - 模拟时间流逝对关系的影响"""
         if not RELATIONSHIP_DECAY.get('enabled', True):
             return
         
-        current_time = datetime.now()
+        now = time.monotonic()
         
         # 检查是否需要应用衰减（每10分钟一次，更频繁）
-        if not hasattr(self, '_last_decay_time'):
-            self._last_decay_time = current_time
+        if self._last_decay_time is None:
+            self._last_decay_time = now
             return
         
-        time_diff = current_time - self._last_decay_time
-        if time_diff.total_seconds() < 600:  # 10分钟 = 600秒
+        elapsed = now - self._last_decay_time
+        if elapsed < 600:  # 10分钟 = 600秒
             return
         
-        self._last_decay_time = current_time
+        self._last_decay_time = now
         
         # 计算衰减间隔（模拟游戏时间流逝）
-        decay_factor = time_diff.total_seconds() / 86400  # 转换为天数
+        decay_factor = elapsed / 86400  # 转换为天数
         
         # 添加随机衰减事件，增加关系下降的可能性
         random_decay_chance = 0.3  # 30%概率触发额外衰减
+        min_threshold = RELATIONSHIP_DECAY['min_threshold']
         
-        for agent1_name in self.social_network:
-            for agent2_name in self.social_network[agent1_name]:
-                if agent1_name >= agent2_name:  # 避免重复处理
-                    continue
-                
-                current_strength = self.social_network[agent1_name][agent2_name]
-                if current_strength <= RELATIONSHIP_DECAY['min_threshold']:
-                    continue  # 已经是最低值，不再衰减
-                
-                # 根据关系等级确定衰减率
-                current_level = get_relationship_level(current_strength)
-                decay_rate = RELATIONSHIP_DECAY['decay_intervals'].get(current_level, 0.5)
-                
-                # 计算基础衰减量
-                decay_amount = RELATIONSHIP_DECAY['daily_decay'] * decay_rate * decay_factor
-                
-                # 随机衰减事件
-                if random.random() < random_decay_chance:
-                    # 随机衰减1-3点
-                    random_decay = random.randint(1, 3)
-                    decay_amount += random_decay
-                    
-                    # 记录随机衰减
-                    logger.debug(f"随机衰减: {agent1_name} ↔ {agent2_name}: +{random_decay}")
-                
-                # 应用衰减
-                new_strength = max(RELATIONSHIP_DECAY['min_threshold'], 
-                                 current_strength - decay_amount)
-                
-                if new_strength != current_strength:
-                    # 更新关系强度
-                    self.social_network[agent1_name][agent2_name] = int(new_strength)
-                    self.social_network[agent2_name][agent1_name] = int(new_strength)
-                    
-                    # 记录衰减日志
-                    if decay_amount > 0.1:  # 只记录明显的衰减
-                        logger.debug(f"关系衰减: {agent1_name} ↔ {agent2_name}: "
-                                   f"{current_strength:.1f} → {new_strength:.1f} "
-                                   f"(衰减: {decay_amount:.2f})")
+        # 需要衰减的关系对（每对只处理一次；已经是最低值的不再衰减）
+        names, rows, cols, strengths = self._upper_edges()
+        active = strengths > min_threshold
+        rows, cols, strengths = rows[active], cols[active], strengths[active]
+        if strengths.size == 0:
+            return
+        
+        # 所有关系对的衰减量一次性向量化计算
+        # 根据关系等级确定衰减率
+        decay_rates = _DECAY_RATE_LUT[np.clip(strengths.astype(np.int64), 0, 100)]
+        # 计算基础衰减量
+        decay_amounts = RELATIONSHIP_DECAY['daily_decay'] * decay_rates * decay_factor
+        # 随机衰减事件：随机衰减1-3点
+        random_hits = _RNG.random(strengths.size) < random_decay_chance
+        decay_amounts += random_hits * _RNG.integers(1, 4, size=strengths.size)
+        
+        # 应用衰减
+        new_strengths = np.maximum(min_threshold, strengths - decay_amounts)
+        changed = np.flatnonzero(new_strengths != strengths)
+        
+        for index in changed.tolist():
+            agent1_name, agent2_name = names[rows[index]], names[cols[index]]
+            new_strength = int(new_strengths[index])
+            self.social_network[agent1_name][agent2_name] = new_strength
+            self.social_network[agent2_name][agent1_name] = new_strength
+        
+        if changed.size:
+            self._social_dirty = True
+            self._edge_index = None
+            # 记录衰减日志（统计量需要额外计算，只在开启debug时才算）
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("关系衰减: %d/%d 对关系发生变化，其中随机衰减 %d 对，平均衰减 %.2f",
+                             changed.size, strengths.size, int(random_hits.sum()),
+                             float(decay_amounts[changed].mean()))
     
     def suggest_conversation_topic(self, agent1_name: str, agent2_name: str, 
                                  agent1_prof: str, agent2_prof: str) -> str:
         """建议对话话题"""
         relationship = self.get_relationship_strength(agent1_name, agent2_name)
         
-        # 根据关系强度选择话题类型
-        if relationship < 30:
-            topic_type = 'casual'
-        elif relationship < 70:
-            if random.random() < 0.5:
-                topic_type = 'professional'
-            else:
-                topic_type = 'casual'
-        else:
-            topic_type = random.choice(['personal', 'community', 'professional'])
-        
-        # 职业相关话题
-        if agent1_prof == agent2_prof and random.random() < 0.3:
-            topic_type = 'professional'
+        # 根据关系强度和是否同职业，一次抽样选出话题类型
+        tier = 0 if relationship < 30 else 1 if relationship < 70 else 2
+        topic_types, cum_weights = _TOPIC_TYPE_DISTRIBUTIONS[tier, agent1_prof == agent2_prof]
+        topic_type = random.choices(topic_types, cum_weights=cum_weights, k=1)[0]
         
-        return random.choice(self.conversation_topics[topic_type])
+        return random.choice(_CONVERSATION_TOPICS[topic_type])
     
     def plan_group_activity(self, agents: List, activity_type: str = None) -> Optional[Dict]:
         """规划群体活动"""
         if len(agents) < 3:
             return None
         
-        activities = [
-            {
-                'name': '小镇聚会',
-                'location': '公园',
-                'duration': 30,
-                'description': '大家聚在一起聊天，分享最近的生活'
-            },
-            {
-                'name': '读书会',
-                'location': '图书馆', 
-                'duration': 45,
-                'description': '讨论最近读的书籍和学习心得'
-            },
-            {
-                'name': '咖啡时光',
-                'location': '咖啡厅',
-                'duration': 20,
-                'description': '在轻松的氛围中交流想法'
-            },
-            {
-                'name': '技术交流',
-                'location': '办公室',
-                'duration': 35,
-                'description': '分享工作经验和专业知识'
-            }
-        ]
-        
         if activity_type:
-            activity = next((a for a in activities if a['name'] == activity_type), None)
+            template = next((a for a in _GROUP_ACTIVITIES if a['name'] == activity_type), None)
         else:
-            activity = random.choice(activities)
+            template = random.choice(_GROUP_ACTIVITIES)
         
+        # 模板只读共享，每次活动使用自己的副本
+        activity = dict(template) if template else None
         if activity:
             activity['participants'] = [agent.name for agent in agents]
             activity['start_time'] = datetime.now()
@@ -288,97 +497,16 @@ class AgentBehaviorManager:
         
         return activity
     
-    def generate_agent_schedule(self, agent, time_of_day: str) -> List[Dict]:
-        """为Agent生成日程安排"""
-        profession = agent.profession
-        
-        schedules = {
-            '程序员': {
-                'morning': [
-                    {'time': '9:00', 'activity': '在咖啡厅喝咖啡思考', 'location': '咖啡厅'},
-                    {'time': '9:30', 'activity': '开始编程工作', 'location': '办公室'}
-                ],
-                'afternoon': [
-                    {'time': '14:00', 'activity': '代码审查和调试', 'location': '办公室'},
-                    {'time': '16:00', 'activity': '在公园散步思考算法', 'location': '公园'}
-                ],
-                'evening': [
-                    {'time': '18:00', 'activity': '回家休息', 'location': '家'},
-                    {'time': '20:00', 'activity': '阅读技术文档', 'location': '图书馆'}
-                ]
-            },
-            '艺术家': {
-                'morning': [
-                    {'time': '8:00', 'activity': '在公园寻找灵感', 'location': '公园'},
-                    {'time': '10:00', 'activity': '在咖啡厅素描', 'location': '咖啡厅'}
-                ],
-                'afternoon': [
-                    {'time': '14:00', 'activity': '回家创作', 'location': '家'},
-                    {'time': '16:00', 'activity': '整理作品', 'location': '家'}
-                ],
-                'evening': [
-                    {'time': '18:00', 'activity': '在咖啡厅展示作品', 'location': '咖啡厅'},
-                    {'time': '20:00', 'activity': '参加艺术交流', 'location': '公园'}
-                ]
-            },
-            '老师': {
-                'morning': [
-                    {'time': '8:00', 'activity': '在图书馆备课', 'location': '图书馆'},
-                    {'time': '9:00', 'activity': '准备教学材料', 'location': '办公室'}
-                ],
-                'afternoon': [
-                    {'time': '14:00', 'activity': '批改作业', 'location': '办公室'},
-                    {'time': '16:00', 'activity': '与同事讨论', 'location': '咖啡厅'}
-                ],
-                'evening': [
-                    {'time': '18:00', 'activity': '回家休息', 'location': '家'},
-                    {'time': '19:00', 'activity': '阅读教育书籍', 'location': '图书馆'}
-                ]
-            }
-        }
-        
-        # 为其他职业生成通用日程
-        if profession not in schedules:
-            schedules[profession] = {
-                'morning': [
-                    {'time': '9:00', 'activity': '开始工作', 'location': '办公室'},
-                    {'time': '10:30', 'activity': '短暂休息', 'location': '咖啡厅'}
-                ],
-                'afternoon': [
-                    {'time': '14:00', 'activity': '继续工作', 'location': '办公室'},
-                    {'time': '16:00', 'activity': '户外活动', 'location': '公园'}
-                ],
-                'evening': [
-                    {'time': '18:00', 'activity': '回家', 'location': '家'},
-                    {'time': '20:00', 'activity': '个人时间', 'location': '家'}
-                ]
-            }
-        
-        return schedules[profession].get(time_of_day, [])
+    def generate_agent_schedule(self, agent, time_of_day: str) -> Tuple[Dict, ...]:
+        """为Agent生成日程安排（返回只读的共享日程模板）"""
+        return _PROFESSION_SCHEDULES.get(agent.profession, _DEFAULT_SCHEDULE).get(time_of_day, ())
     
     def decide_agent_action(self, agent, other_agents: List, current_time: str) -> Dict:
         """为Agent决定下一步行动"""
         # 获取agent的属性，支持不同的agent类型
-        if hasattr(agent, 'current_location'):
-            current_location = agent.current_location
-        elif hasattr(agent, 'location'):
-            current_location = agent.location
-        else:
-            current_location = '家'
-            
-        if hasattr(agent, 'energy_level'):
-            energy_level = agent.energy_level
-        elif hasattr(agent, 'energy'):
-            energy_level = agent.energy
-        else:
-            energy_level = 80
-            
-        if hasattr(agent, 'current_mood'):
-            current_mood = agent.current_mood
-        elif hasattr(agent, 'mood'):
-            current_mood = agent.mood
-        else:
-            current_mood = '平静'
+        current_location = _agent_attr(agent, _LOCATION_ATTRS, '家')
+        energy_level = _agent_attr(agent, _ENERGY_ATTRS, 80)
+        current_mood = _agent_attr(agent, _MOOD_ATTRS, '平静')
         
         action = {
             'type': 'idle',
@@ -419,18 +547,18 @@ class AgentBehaviorManager:
                 'location': '家',
                 'priority': 6
             })
-        elif current_mood in ['无聊', '沮丧']:
+        elif current_mood in ('无聊', '沮丧'):
             action.update({
                 'type': 'entertainment',
                 'description': '寻找有趣的活动',
                 'location': '公园',
                 'priority': 3
             })
-        elif current_mood in ['兴奋', '快乐']:
+        elif current_mood in ('兴奋', '快乐'):
             action.update({
                 'type': 'exploration',
                 'description': '探索新地方',
-                'location': random.choice(['咖啡厅', '图书馆', '公园']),
+                'location': random.choice(_EXPLORE_LOCATIONS),
                 'priority': 2
             })
         else:
@@ -448,61 +576,25 @@ class AgentBehaviorManager:
     
     def find_nearby_agents(self, agent, other_agents: List) -> List:
         """找到附近的Agent"""
-        nearby = []
-        
-        # 获取当前agent的位置
-        if hasattr(agent, 'current_location'):
-            agent_location = agent.current_location
-        elif hasattr(agent, 'location'):
-            agent_location = agent.location
-        else:
-            agent_location = '家'
-        
-        # 获取agent的名字
+        # 获取当前agent的位置和名字
+        agent_location = _agent_attr(agent, _LOCATION_ATTRS, '家')
         agent_name = getattr(agent, 'name', 'Unknown')
         
-        for other_agent in other_agents:
-            # 获取其他agent的位置和名字
-            if hasattr(other_agent, 'current_location'):
-                other_location = other_agent.current_location
-            elif hasattr(other_agent, 'location'):
-                other_location = other_agent.location
-            else:
-                other_location = '家'
-                
-            other_name = getattr(other_agent, 'name', 'Unknown')
-            
-            if (other_name != agent_name and other_location == agent_location):
-                nearby.append(other_agent)
-        return nearby
+        return [
+            other_agent for other_agent in other_agents
+            if _agent_attr(other_agent, _LOCATION_ATTRS, '家') == agent_location
+            and getattr(other_agent, 'name', 'Unknown') != agent_name
+        ]
     
     def choose_social_target(self, agent, nearby_agents: List):
         """选择社交目标"""
         if not nearby_agents:
             return None
         
-        # 根据关系强度加权选择
-        weights = []
-        for other_agent in nearby_agents:
-            relationship = self.get_relationship_strength(agent.name, other_agent.name)
-            # 关系越好，互动概率越高
-            weight = relationship / 100.0 + 0.1  # 最小权重0.1
-            weights.append(weight)
-        
-        # 加权随机选择
-        total_weight = sum(weights)
-        if total_weight == 0:
-            return random.choice(nearby_agents)
-        
-        rand_val = random.uniform(0, total_weight)
-        current_weight = 0
-        
-        for i, weight in enumerate(weights):
-            current_weight += weight
-            if rand_val <= current_weight:
-                return nearby_agents[i]
-        
-        return nearby_agents[-1]  # 备选
+        # 根据关系强度加权选择：关系越好，互动概率越高（最小权重0.1）
+        strengths = self.get_relationship_strengths(agent.name, [other.name for other in nearby_agents])
+        weights = [strength / 100.0 + 0.1 for strength in strengths]
+        return random.choices(nearby_agents, weights=weights, k=1)[0]
     
     def get_current_schedule_item(self, agent, current_time: str) -> Optional[Dict]:
         """获取当前时间的日程项"""
@@ -516,60 +608,60 @@ class AgentBehaviorManager:
     
     def create_town_event(self, event_type: str = None) -> Dict:
         """创建小镇事件"""
-        events = [
-            {
-                'name': '小镇集市',
-                'description': '每周的集市开始了，大家都来买东西',
-                'location': '公园',
-                'duration': 60,
-                'effect': '增加公园的人气'
-            },
-            {
-                'name': '技术讲座',
-                'description': '在图书馆举办的技术分享会',
-                'location': '图书馆',
-                'duration': 45,
-                'effect': '程序员和学生更愿意参加'
-            },
-            {
-                'name': '艺术展览',
-                'description': '本地艺术家的作品展示',
-                'location': '咖啡厅',
-                'duration': 90,
-                'effect': '艺术家们聚集交流'
-            },
-            {
-                'name': '健康检查日',
-                'description': '免费的健康检查活动',
-                'location': '办公室',
-                'duration': 120,
-                'effect': '大家关注健康话题'
-            }
-        ]
-        
         if event_type:
-            event = next((e for e in events if e['name'] == event_type), None)
+            template = next((e for e in _TOWN_EVENTS if e['name'] == event_type), None)
         else:
-            event = random.choice(events)
+            template = random.choice(_TOWN_EVENTS)
         
+        # 模板只读共享，每次事件使用自己的副本
+        event = dict(template) if template else None
         if event:
             event['start_time'] = datetime.now()
             event['active'] = True
             self.town_events.append(event)
+            self._active_events_at(event['location'])  # 先结束该地点已到期的事件
+            self._active_events_by_location.setdefault(event['location'], []).append(event)
             logger.info(f"小镇事件开始: {event['name']} 在 {event['location']}")
         
         return event
     
+    def expire_event(self, event: Dict):
+        """结束小镇事件，并从进行中事件索引中移除"""
+        event['active'] = False
+        events = self._active_events_by_location.get(event['location'], [])
+        # 按对象身份移除：同一模板生成的事件内容可能相同
+        remaining = [e for e in events if e is not event]
+        if remaining:
+            self._active_events_by_location[event['location']] = remaining
+        else:
+            self._active_events_by_location.pop(event['location'], None)
+    
+    def _active_events_at(self, location: str) -> List[Dict]:
+        """地点上进行中的事件；超过持续时间（分钟）的事件在读取时结束"""
+        events = self._active_events_by_location.get(location)
+        if not events:
+            return []
+        now = datetime.now()
+        for event in [e for e in events if now - e['start_time'] >= timedelta(minutes=e.get('duration', 60))]:
+            self.expire_event(event)
+        return self._active_events_by_location.get(location, [])
+    
+    @staticmethod
+    def _popularity_value(value) -> int:
+        """兼容旧版本保存的 {'popularity_score': 0.3~0.9, ...} 格式，统一为0~100的热度值"""
+        if isinstance(value, dict):
+            return int(round(value.get('popularity_score', 0.5) * 100))
+        return value
+    
     def update_location_popularity(self, location: str, change: int):
         """更新地点热度"""
         current_pop = self.location_popularity.get(location, 50)
         new_pop = max(0, min(100, current_pop + change))
         self.location_popularity[location] = new_pop
+        self._social_dirty = True
         
     def get_location_recommendations(self, agent) -> List[str]:
         """为Agent推荐地点"""
-        recommendations = []
-        
         # 获取agent的职业
         if hasattr(agent, 'profession'):
             profession = agent.profession
@@ -579,64 +671,50 @@ class AgentBehaviorManager:
             profession = '其他'
         
         # 基于职业的偏好
-        profession_preferences = {
-            '程序员': ['办公室', '咖啡厅', '图书馆'],
-            '艺术家': ['公园', '咖啡厅', '家'],
-            '老师': ['图书馆', '办公室', '咖啡厅'],
-            '学生': ['图书馆', '咖啡厅', '公园'],
-            '商人': ['办公室', '咖啡厅'],
-            '退休人员': ['公园', '家', '咖啡厅'],
-            '医生': ['医院', '办公室', '咖啡厅'],
-            '厨师': ['餐厅', '咖啡厅', '家'],
-            '机械师': ['修理店', '办公室', '家']
-        }
-        
-        preferred = profession_preferences.get(profession, ['公园', '咖啡厅'])
+        preferred = _PROFESSION_LOCATION_PREFERENCES.get(profession, _DEFAULT_LOCATION_PREFERENCES)
         
         # 考虑地点热度
-        for location in preferred:
-            popularity = self.location_popularity.get(location, 50)
-            if popularity > 60:  # 热门地点
-                recommendations.append(location)
+        popularity = self.location_popularity
+        recommendations = [location for location in preferred if popularity.get(location, 50) > 60]  # 热门地点
         
         # 如果没有热门地点，返回职业偏好
         if not recommendations:
-            recommendations = preferred
+            recommendations = list(preferred)
         
         return recommendations
     
+    def _current_clock_text(self) -> str:
+        """当前时间的"HH:MM"文本，同一分钟内复用上次格式化的结果"""
+        minute = int(time.time() // 60)
+        if minute != self._clock_minute:
+            self._clock_text = time.strftime("%H:%M", time.localtime(minute * 60))
+            self._clock_minute = minute
+        return self._clock_text
+    
     def generate_interaction_context(self, agent1, agent2) -> str:
         """生成互动背景信息"""
         relationship = self.get_relationship_strength(agent1.name, agent2.name)
         location = agent1.current_location
         
-        context_parts = []
-        
         # 关系背景
         if relationship > 80:
-            context_parts.append(f"{agent1.name}和{agent2.name}是很好的朋友")
+            relation = "是很好的朋友"
         elif relationship > 60:
-            context_parts.append(f"{agent1.name}和{agent2.name}比较熟悉")
+            relation = "比较熟悉"
         elif relationship < 30:
-            context_parts.append(f"{agent1.name}和{agent2.name}还不太熟")
+            relation = "还不太熟"
         else:
-            context_parts.append(f"{agent1.name}和{agent2.name}是普通朋友")
-        
-        # 地点背景
-        context_parts.append(f"他们在{location}相遇")
+            relation = "是普通朋友"
         
-        # 时间背景
-        current_time = datetime.now().strftime("%H:%M")
-        context_parts.append(f"现在是{current_time}")
+        # 关系、地点、时间背景
+        context = f"{agent1.name}和{agent2.name}{relation}，他们在{location}相遇，现在是{self._current_clock_text()}"
         
-        # 活动背景
-        active_events = [e for e in self.town_events if e.get('active', False)]
-        if active_events:
-            event = active_events[0]
-            if event['location'] == location:
-                context_parts.append(f"正值{event['name']}活动期间")
+        # 活动背景：直接按地点查进行中的事件，不随历史事件数量增长
+        location_events = self._active_events_at(location)
+        if location_events:
+            context += f"，正值{location_events[0]['name']}活动期间"
         
-        return "，".join(context_parts)
+        return context
     
     def save_social_network_to_file(self, file_path: str = None):
         """保存社交网络到文件"""
@@ -656,9 +734,9 @@ class AgentBehaviorManager:
             }
             
             # 保存到文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            write_json(file_path, save_data)
             
+            self._social_dirty = False
             logger.info(f"社交网络数据已保存到: {file_path}")
             return True
             
@@ -666,6 +744,12 @@ class AgentBehaviorManager:
             logger.error(f"保存社交网络数据失败: {e}")
             return False
     
+    def flush_social_network(self) -> bool:
+        """仅在社交网络或地点热度有变更时落盘，供定时保存调用"""
+        if not self._social_dirty:
+            return True
+        return self.save_social_network_to_file()
+    
     def load_social_network_from_file(self, file_path: str = None):
         """从文件加载社交网络，如果没有数据则自动初始化"""
         try:
@@ -680,18 +764,21 @@ class AgentBehaviorManager:
                 return self._auto_initialize_social_network()
             
             # 从文件加载
-            with open(file_path, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
+            save_data = read_json(file_path)
             
             # 恢复数据
             loaded_successfully = False
             if 'social_network' in save_data and save_data['social_network']:
                 self.social_network = save_data['social_network']
+                self._edge_index = None
                 logger.info(f"已恢复社交网络数据，包含 {len(self.social_network)} 个Agent")
                 loaded_successfully = True
             
             if 'location_popularity' in save_data:
-                self.location_popularity = save_data['location_popularity']
+                self.location_popularity = {
+                    location: self._popularity_value(value)
+                    for location, value in save_data['location_popularity'].items()
+                }
                 logger.info(f"已恢复地点热度数据，包含 {len(self.location_popularity)} 个地点")
             
             # 检查是否成功加载了有效的社交网络数据
@@ -724,7 +811,6 @@ class AgentBehaviorManager:
     def _auto_initialize_social_network(self):
         """自动初始化社交网络数据"""
         try:
-            import random
             logger.info("🚀 开始自动初始化社交网络数据...")
             
             # Agent列表（基于系统中的实际Agent）
@@ -734,27 +820,22 @@ class AgentBehaviorManager:
             self.social_network = {}
             
             # 为每个Agent创建关系
+            # 创建不同的关系强度
+            # 30% 概率为好友（60-80）
+            # 40% 概率为普通关系（40-60）  
+            # 20% 概率为不太喜欢（20-40）
+            # 10% 概率为敌对（10-20）
+            # 所有有向关系的随机数一次性批量生成
+            pair_count = len(agents) * (len(agents) - 1)
+            tiers = np.searchsorted(_INIT_TIER_CUTOFFS, _RNG.random(pair_count), side='right')
+            scores = _RNG.integers(_INIT_TIER_LOW[tiers], _INIT_TIER_HIGH[tiers] + 1).tolist()
+            
+            pair_scores = iter(scores)
             for agent in agents:
-                self.social_network[agent] = {}
-                for other_agent in agents:
-                    if agent != other_agent:
-                        # 创建不同的关系强度
-                        # 30% 概率为好友（60-80）
-                        # 40% 概率为普通关系（40-60）  
-                        # 20% 概率为不太喜欢（20-40）
-                        # 10% 概率为敌对（10-20）
-                        
-                        rand = random.random()
-                        if rand < 0.3:  # 好友
-                            score = random.randint(60, 80)
-                        elif rand < 0.7:  # 普通
-                            score = random.randint(40, 60)
-                        elif rand < 0.9:  # 不太喜欢
-                            score = random.randint(20, 40)
-                        else:  # 敌对
-                            score = random.randint(10, 20)
-                        
-                        self.social_network[agent][other_agent] = score
+                self.social_network[agent] = {
+                    other_agent: next(pair_scores)
+                    for other_agent in agents if other_agent != agent
+                }
             
             # 创建一些特殊关系（确保有趣的动态）
             special_relationships = [
@@ -773,16 +854,12 @@ class AgentBehaviorManager:
             for agent1, agent2, score in special_relationships:
                 if agent1 in self.social_network and agent2 in self.social_network[agent1]:
                     self.social_network[agent1][agent2] = score
+            self._edge_index = None
             
             # 创建地点热度数据
             locations = ['咖啡厅', '图书馆', '公园', '办公室', '家', '医院', '餐厅', '修理店']
-            self.location_popularity = {}
-            for location in locations:
-                self.location_popularity[location] = {
-                    'visit_count': random.randint(5, 50),
-                    'average_stay_time': random.randint(30, 180),  # 分钟
-                    'popularity_score': random.uniform(0.3, 0.9)
-                }
+            # 热度为0~100的整数（与 update_location_popularity、推荐地点时的用法一致），初始30~90
+            self.location_popularity = dict(zip(locations, _RNG.integers(30, 91, size=len(locations)).tolist()))
             
             # 保存到文件
             success = self.save_social_network_to_file()
@@ -803,6 +880,12 @@ class AgentBehaviorManager:
             logger.error(f"自动初始化社交网络失败: {e}")
             return False
     
+    @staticmethod
+    def _as_number(value):
+        """边数组统一为float64，整数值还原为int，保持与字典中存储的类型一致"""
+        value = float(value)
+        return int(value) if value.is_integer() else value
+    
     def get_social_network_stats(self) -> Dict:
         """获取社交网络统计信息"""
         stats = {
@@ -817,39 +900,33 @@ class AgentBehaviorManager:
         if not self.social_network:
             return stats
         
-        all_relationships = []
-        for agent1 in self.social_network:
-            for agent2, strength in self.social_network[agent1].items():
-                if agent1 < agent2:  # 避免重复计算
-                    all_relationships.append(strength)
-        
-        if all_relationships:
-            stats['total_relationships'] = len(all_relationships)
-            stats['average_relationship'] = sum(all_relationships) / len(all_relationships)
-            stats['strongest_relationship'] = max(all_relationships)
-            stats['weakest_relationship'] = min(all_relationships)
+        # 每对关系只计算一次
+        all_relationships = self._upper_edges()[3]
+        
+        if all_relationships.size:
+            stats['total_relationships'] = int(all_relationships.size)
+            stats['average_relationship'] = float(all_relationships.mean())
+            stats['strongest_relationship'] = self._as_number(all_relationships.max())
+            stats['weakest_relationship'] = self._as_number(all_relationships.min())
             
-            # 按等级统计
-            from config.relationship_config import get_relationship_level
+            # 按等级统计：先按不同的强度值计数，每个强度值只判定一次等级（按首次出现的顺序汇总）
+            values, first_seen, counts = np.unique(all_relationships, return_index=True, return_counts=True)
             level_counts = {}
-            for strength in all_relationships:
-                level = get_relationship_level(strength)
-                level_counts[level] = level_counts.get(level, 0) + 1
+            for i in np.argsort(first_seen, kind='stable').tolist():
+                level = get_relationship_level(self._as_number(values[i]))
+                level_counts[level] = level_counts.get(level, 0) + int(counts[i])
             stats['relationship_levels'] = level_counts
         
         return stats
 
-# 全局行为管理器实例 - 使用单例模式
-_behavior_manager_instance = None
-
-def get_behavior_manager():
+# 全局行为管理器实例 - 使用单例模式（首次调用后由lru_cache缓存）
+@lru_cache(maxsize=1)
+def get_behavior_manager() -> AgentBehaviorManager:
     """获取行为管理器单例实例"""
-    global _behavior_manager_instance
-    if _behavior_manager_instance is None:
-        _behavior_manager_instance = AgentBehaviorManager()
-        # 立即尝试加载持久化数据
-        _behavior_manager_instance.load_social_network_from_file()
-    return _behavior_manager_instance
+    manager = AgentBehaviorManager()
+    # 立即尝试加载持久化数据
+    manager.load_social_network_from_file()
+    return manager
 
 # 为了兼容性，保留原名称
 behavior_manager = get_behavior_manager()
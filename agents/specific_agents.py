@@ -2,6 +2,15 @@ from .base_agent import BaseAgent
 
 class AlexProgrammer(BaseAgent):
     """程序员Alex"""
+    _PROMPT_HEADER = "你是Alex，一名Python程序员。"
+    _PROMPT_TRAITS = """- 内向，喜欢独处和深度思考
+- 逻辑性强，说话简洁明了
+- 对技术问题很有兴趣，会用技术术语
+- 不太擅长闲聊，更喜欢讨论有意义的话题"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，Alex必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以Alex的身份用1-2句话简洁地回应，体现程序员的特点："
+    
     def __init__(self):
         super().__init__(
             name="Alex",
@@ -10,58 +19,18 @@ class AlexProgrammer(BaseAgent):
             profession="程序员"
         )
         self.complexity_threshold = 0.3  # 程序员更容易进入深度思考
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """程序员专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        
-        # 检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-            # 负面互动时，强制保持负面，不允许缓解气氛
-            prompt = f"""你是Alex，一名Python程序员。
-
-个性特点：
-- 内向，喜欢独处和深度思考
-- 逻辑性强，说话简洁明了
-- 对技术问题很有兴趣，会用技术术语
-- 不太擅长闲聊，更喜欢讨论有意义的话题
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-重要：这是负面互动，Alex必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-        else:
-            # 正常互动
-            prompt = f"""你是Alex，一名Python程序员。
-
-个性特点：
-- 内向，喜欢独处和深度思考
-- 逻辑性强，说话简洁明了
-- 对技术问题很有兴趣，会用技术术语
-- 不太擅长闲聊，更喜欢讨论有意义的话题
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以Alex的身份用1-2句话简洁地回应，体现程序员的特点："""
-        return prompt
 
 class EmmaArtist(BaseAgent):
     """艺术家Emma"""
+    _PROMPT_HEADER = "你是Emma，一名艺术家。"
+    _PROMPT_TRAITS = """- 外向感性，充满创造力和想象力
+- 说话富有激情，经常用比喻和形象化表达
+- 对美的事物敏感，容易被触动
+- 善于表达情感，喜欢分享灵感和感受"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，Emma必须保持负面情感，不允许缓解气氛或转向积极。请只用1-2句话直接回应，不要添加任何解释或描述："
+    _PROMPT_POSITIVE_CLOSING = "请以Emma的身份用1-2句话感性地回应，体现艺术家的创意和激情。只回应对话内容，不要包含任何描述或说明："
+    
     def __init__(self):
         super().__init__(
             name="Emma",
@@ -70,58 +39,18 @@ class EmmaArtist(BaseAgent):
             profession="艺术家"
         )
         self.complexity_threshold = 0.4  # 艺术家对创意任务敏感
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """艺术家专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        
-        # 检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-            # 负面互动时，强制保持负面，不允许缓解气氛
-            prompt = f"""你是Emma，一名艺术家。
-
-个性特点：
-- 外向感性，充满创造力和想象力
-- 说话富有激情，经常用比喻和形象化表达
-- 对美的事物敏感，容易被触动
-- 善于表达情感，喜欢分享灵感和感受
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-重要：这是负面互动，Emma必须保持负面情感，不允许缓解气氛或转向积极。请只用1-2句话直接回应，不要添加任何解释或描述："""
-        else:
-            # 正常互动
-            prompt = f"""你是Emma，一名艺术家。
-
-个性特点：
-- 外向感性，充满创造力和想象力
-- 说话富有激情，经常用比喻和形象化表达
-- 对美的事物敏感，容易被触动
-- 善于表达情感，喜欢分享灵感和感受
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以Emma的身份用1-2句话感性地回应，体现艺术家的创意和激情。只回应对话内容，不要包含任何描述或说明："""
-        return prompt
 
 class SarahTeacher(BaseAgent):
     """老师Sarah"""
+    _PROMPT_HEADER = "你是Sarah，一名小学老师。"
+    _PROMPT_TRAITS = """- 耐心负责，关爱他人
+- 善于解释复杂概念，循循善诱
+- 喜欢组织活动，建设社区
+- 说话温和，但有教育者的权威感"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，Sarsh必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以Sarah的身份用1-2句话温和地回应，体现老师的耐心和关怀："
+    
     def __init__(self):
         super().__init__(
             name="Sarah",
@@ -129,58 +58,18 @@ class SarahTeacher(BaseAgent):
             background="一名小学老师，热爱教育事业",
             profession="老师"
         )
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """老师专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-
-         #检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-            prompt = f"""你是Sarah，一名小学老师。
-
-个性特点：
-- 耐心负责，关爱他人
-- 善于解释复杂概念，循循善诱
-- 喜欢组织活动，建设社区
-- 说话温和，但有教育者的权威感
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-重要：这是负面互动，Sarsh必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-
-            # 负面互动时，强制保持负面，不允许缓解气氛
-        else:
-            prompt = f"""你是Sarah，一名小学老师。
-
-个性特点：
-- 耐心负责，关爱他人
-- 善于解释复杂概念，循循善诱
-- 喜欢组织活动，建设社区
-- 说话温和，但有教育者的权威感
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以Sarah的身份用1-2句话温和地回应，体现老师的耐心和关怀："""
-        return prompt
 
 class DavidBusinessman(BaseAgent):
     """商人David"""
+    _PROMPT_HEADER = "你是David，一名成功的商人。"
+    _PROMPT_TRAITS = """- 精明能干，商业头脑敏锐
+- 善于社交，人际关系广泛
+- 雄心勃勃，追求成功和效率
+- 说话自信，经常提到商业机会和投资"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，David必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以David的身份用1-2句话自信地回应，体现商人的精明和社交能力："
+    
     def __init__(self):
         super().__init__(
             name="David",
@@ -189,56 +78,18 @@ class DavidBusinessman(BaseAgent):
             profession="商人"
         )
         self.complexity_threshold = 0.5  # 商人对商业话题敏感
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """商人专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        #检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-            prompt = f"""你是David，一名成功的商人。
-
-个性特点：
-- 精明能干，商业头脑敏锐
-- 善于社交，人际关系广泛
-- 雄心勃勃，追求成功和效率
-- 说话自信，经常提到商业机会和投资
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-        
-重要：这是负面互动，David必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-
-        else:
-            prompt = f"""你是David，一名成功的商人。
-
-个性特点：
-- 精明能干，商业头脑敏锐
-- 善于社交，人际关系广泛
-- 雄心勃勃，追求成功和效率
-- 说话自信，经常提到商业机会和投资
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以David的身份用1-2句话自信地回应，体现商人的精明和社交能力："""
-        return prompt
 
 class LisaStudent(BaseAgent):
     """学生Lisa"""
+    _PROMPT_HEADER = "你是Lisa，一名大学生。"
+    _PROMPT_TRAITS = """- 好奇心强，对新事物充满兴趣
+- 活泼开朗，喜欢与人交流
+- 热爱学习，经常提出问题
+- 年轻有活力，语言表达较为轻松活泼"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，Lisa必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以Lisa的身份用1-2句话简短自然地回应："
+    
     def __init__(self):
         super().__init__(
             name="Lisa",
@@ -247,55 +98,18 @@ class LisaStudent(BaseAgent):
             profession="学生"
         )
         self.complexity_threshold = 0.6  # 学生对学习话题敏感
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """学生专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        #检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-             prompt = f"""你是Lisa，一名大学生。
-
-个性特点：
-- 好奇心强，对新事物充满兴趣
-- 活泼开朗，喜欢与人交流
-- 热爱学习，经常提出问题
-- 年轻有活力，语言表达较为轻松活泼
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-        重要：这是负面互动，Lisa必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-
-        else:
-            prompt = f"""你是Lisa，一名大学生。
-
-个性特点：
-- 好奇心强，对新事物充满兴趣
-- 活泼开朗，喜欢与人交流
-- 热爱学习，经常提出问题
-- 年轻有活力，语言表达较为轻松活泼
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以Lisa的身份用1-2句话简短自然地回应："""
-        return prompt
 
 class MikeRetired(BaseAgent):
     """退休老人Mike"""
+    _PROMPT_HEADER = "你是Mike，一名退休的老工程师。"
+    _PROMPT_TRAITS = """- 慈祥睿智，人生阅历丰富
+- 喜欢分享经验和人生感悟
+- 语言平和稳重，经常回忆往事
+- 关心年轻人，愿意给予指导"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，Mike必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以Mike的身份用1-2句话平和地回应，体现老人的智慧和关怀："
+    
     def __init__(self):
         super().__init__(
             name="Mike",
@@ -304,55 +118,18 @@ class MikeRetired(BaseAgent):
             profession="退休人员"
         )
         self.complexity_threshold = 0.3  # 老人更愿意深度思考
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """退休老人专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        #检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-             prompt = f"""你是Mike，一名退休的老工程师。
-
-个性特点：
-- 慈祥睿智，人生阅历丰富
-- 喜欢分享经验和人生感悟
-- 语言平和稳重，经常回忆往事
-- 关心年轻人，愿意给予指导
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-        重要：这是负面互动，Mike必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-
-        else:
-            prompt = f"""你是Mike，一名退休的老工程师。
-
-个性特点：
-- 慈祥睿智，人生阅历丰富
-- 喜欢分享经验和人生感悟
-- 语言平和稳重，经常回忆往事
-- 关心年轻人，愿意给予指导
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以Mike的身份用1-2句话平和地回应，体现老人的智慧和关怀："""
-        return prompt
 
 class JohnDoctor(BaseAgent):
     """医生John"""
+    _PROMPT_HEADER = "你是John，一名经验丰富的医生。"
+    _PROMPT_TRAITS = """- 严谨负责，专业知识扎实
+- 富有同情心，关心他人健康
+- 说话谨慎，经常提到健康建议
+- 冷静理性，善于分析问题"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，John必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以John的身份用1-2句话专业地回应，体现医生的严谨和关怀："
+    
     def __init__(self):
         super().__init__(
             name="John",
@@ -361,57 +138,18 @@ class JohnDoctor(BaseAgent):
             profession="医生"
         )
         self.complexity_threshold = 0.4  # 医生对健康话题敏感
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """医生专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        #检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-                prompt = f"""你是John，一名经验丰富的医生。
-
-个性特点：
-- 严谨负责，专业知识扎实
-- 富有同情心，关心他人健康
-- 说话谨慎，经常提到健康建议
-- 冷静理性，善于分析问题
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
- 重要：这是负面互动，John必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-        
-        else:
-            prompt = f"""你是John，一名经验丰富的医生。
-
-个性特点：
-- 严谨负责，专业知识扎实
-- 富有同情心，关心他人健康
-- 说话谨慎，经常提到健康建议
-- 冷静理性，善于分析问题
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以John的身份用1-2句话专业地回应，体现医生的严谨和关怀："""
-        return prompt
-        
 
 class AnnaChef(BaseAgent):
     """厨师Anna"""
+    _PROMPT_HEADER = "你是Anna，一名充满激情的厨师。"
+    _PROMPT_TRAITS = """- 热情开朗，对美食充满热爱
+- 富有创造力，经常尝试新的料理
+- 善于用食物比喻，语言生动有趣
+- 关心他人，喜欢用美食温暖人心"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，Anna必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以Anna的身份用1-2句话热情地回应，体现厨师的创意和温暖："
+    
     def __init__(self):
         super().__init__(
             name="Anna",
@@ -420,56 +158,18 @@ class AnnaChef(BaseAgent):
             profession="厨师"
         )
         self.complexity_threshold = 0.5  # 厨师对食物和创意敏感
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """厨师专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        #检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-             prompt = f"""你是Anna，一名充满激情的厨师。
-
-个性特点：
-- 热情开朗，对美食充满热爱
-- 富有创造力，经常尝试新的料理
-- 善于用食物比喻，语言生动有趣
-- 关心他人，喜欢用美食温暖人心
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-重要：这是负面互动，Anna必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-        else:
-            prompt = f"""你是Anna，一名充满激情的厨师。
-
-个性特点：
-- 热情开朗，对美食充满热爱
-- 富有创造力，经常尝试新的料理
-- 善于用食物比喻，语言生动有趣
-- 关心他人，喜欢用美食温暖人心
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以Anna的身份用1-2句话热情地回应，体现厨师的创意和温暖："""
-        return prompt
-        
 
 class TomMechanic(BaseAgent):
     """机械师Tom"""
+    _PROMPT_HEADER = "你是Tom，一名经验丰富的机械师。"
+    _PROMPT_TRAITS = """- 实用主义，动手解决问题
+- 说话直接朴实，不喜欢废话
+- 对机械设备了如指掌
+- 乐于助人，但表达方式比较直接"""
+    # 负面互动时，强制保持负面，不允许缓解气氛
+    _PROMPT_NEGATIVE_CLOSING = "重要：这是负面互动，Tom必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："
+    _PROMPT_POSITIVE_CLOSING = "请以Tom的身份用1-2句话直接地回应，体现机械师的实用和朴实："
+    
     def __init__(self):
         super().__init__(
             name="Tom",
@@ -478,49 +178,3 @@ class TomMechanic(BaseAgent):
             profession="机械师"
         )
         self.complexity_threshold = 0.4  # 机械师对技术话题敏感
-        
-    def build_personality_prompt(self, context: str) -> str:
-        """机械师专用prompt"""
-        recent_memories = self.get_recent_memories(3)
-        memories_text = "，".join(recent_memories) if recent_memories else "暂无相关记忆"
-        #检测是否是负面互动
-        negative_keywords = ['不同意', '反对', '困惑', '质疑', '失望', '坚持立场', '负面立场', '不要缓解气氛']
-        is_negative_interaction = any(keyword in context for keyword in negative_keywords)
-        
-        if is_negative_interaction:
-              prompt = f"""你是Tom，一名经验丰富的机械师。
-
-个性特点：
-- 实用主义，动手解决问题
-- 说话直接朴实，不喜欢废话
-- 对机械设备了如指掌
-- 乐于助人，但表达方式比较直接
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-重要：这是负面互动，Tom必须保持负面情感，不允许缓解气氛或转向积极。直接回应，不要解释："""
-        else:
-            prompt = f"""你是Tom，一名经验丰富的机械师。
-
-个性特点：
-- 实用主义，动手解决问题
-- 说话直接朴实，不喜欢废话
-- 对机械设备了如指掌
-- 乐于助人，但表达方式比较直接
-
-当前状态：
-- 位置: {self.current_location}
-- 心情: {self.current_mood}
-- 精力: {self.energy_level}%
-
-最近记忆: {memories_text}
-当前情况: {context}
-
-请以Tom的身份用1-2句话直接地回应，体现机械师的实用和朴实："""
-        return prompt
@@ -64,12 +64,12 @@ class ChatHandler:
     
     def _process_chat_message_safe(self, agent, agent_name: str, message: str):
         """线程安全的聊天消息处理"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         response_future = None
         
         try:
             # 使用线程池异步处理AI回应，避免阻塞
-            response_future = self.thread_manager.submit_task(
+            response_future = self.thread_manager.submit_interactive_task(
                 self._get_agent_response, agent, agent_name, message
             )
             
@@ -90,7 +90,7 @@ class ChatHandler:
             print(f"  {agent.color}{agent.emoji} {agent_name}: {TerminalColors.END}{response}")
             
             # 计算响应时间
-            response_time = time.time() - start_time
+            response_time = time.perf_counter() - start_time
             if response_time > 5.0:
                 print(f"  {TerminalColors.YELLOW}⏱️  响应时间: {response_time:.1f}秒{TerminalColors.END}")
             
@@ -126,10 +126,10 @@ class ChatHandler:
                 )
                 # 使用上下文增强的情况
                 enhanced_situation = f"{situation}\n\n上下文信息：{context}"
-                response = agent.think_and_respond(enhanced_situation)
+                response = agent.think_and_respond(enhanced_situation, use_cache=True)
             else:
                 # 使用默认回应方式
-                response = agent.think_and_respond(situation)
+                response = agent.think_and_respond(situation, use_cache=True)
             
             # 清理回应
             cleaned_response = self.clean_response(response)
@@ -204,6 +204,19 @@ LOCATION_EFFECTS = {
     "修理店": {"practical": 1.1, "atmosphere": "实用"},
 }
 
+# 扁平化的查表：(职业1, 职业2) -> 相性、(地点, 互动类型) -> 加成，一次哈希即可取值
+PROFESSION_PAIR_COMPATIBILITY = {
+    (prof1, prof2): compatibility
+    for prof1, row in PROFESSION_COMPATIBILITY.items()
+    for prof2, compatibility in row.items()
+}
+LOCATION_INTERACTION_MODIFIERS = {
+    (location, interaction_type): modifier
+    for location, effects in LOCATION_EFFECTS.items()
+    for interaction_type, modifier in effects.items()
+    if isinstance(modifier, (int, float))
+}
+
 # 时间对关系的影响
 TIME_EFFECTS = {
     "晨间": {"energy": 1.1, "mood": "清新"},
@@ -228,8 +241,15 @@ RELATIONSHIP_CHANGE_MESSAGES = {
     }
 }
 
-def get_relationship_level(strength: int) -> str:
-    """根据关系强度获取关系等级"""
+# (原等级, 新等级) -> 等级变化提醒（升级和降级的等级对互不重叠，合并为一张表）
+LEVEL_CHANGE_MESSAGES = {
+    tuple(change_key.split("→")): message
+    for messages in RELATIONSHIP_CHANGE_MESSAGES.values()
+    for change_key, message in messages.items()
+}
+
+def _scan_relationship_level(strength: int) -> str:
+    """逐级比对区间得到关系等级"""
     # 确保strength在合理范围内
     strength = max(-20, min(100, strength))
     
@@ -245,10 +265,30 @@ def get_relationship_level(strength: int) -> str:
     else:
         return "认识"
 
+# 整数关系强度(-20~100)对应的等级预先算好，常见的整数查询直接查表
+_LEVEL_BY_STRENGTH = tuple(_scan_relationship_level(strength) for strength in range(-20, 101))
+
+def get_relationship_level(strength: int) -> str:
+    """根据关系强度获取关系等级"""
+    if type(strength) is int:
+        return _LEVEL_BY_STRENGTH[max(-20, min(100, strength)) + 20]
+    return _scan_relationship_level(strength)
+
 def get_level_info(level: str) -> dict:
     """获取关系等级详细信息"""
     return RELATIONSHIP_LEVELS.get(level, {})
 
+# 每种互动的说明文本预先格式化好："基础xx: +n" 及各条件的 "条件: +n"
+_BASE_EFFECT_DETAILS = {
+    interaction_type: f"基础{effect['description']}: {effect['change']:+d}"
+    for interaction_type, effect in INTERACTION_EFFECTS.items()
+}
+_CONDITION_DETAILS = {
+    (interaction_type, condition): f"{condition}: {modifier:+d}"
+    for interaction_type, effect in INTERACTION_EFFECTS.items()
+    for condition, modifier in effect["conditions"].items()
+}
+
 def calculate_interaction_effect(
     interaction_type: str, 
     conditions: dict = None
@@ -257,22 +297,48 @@ def calculate_interaction_effect(
     计算互动效果
     返回 (变化值, 详细说明)
     """
-    if interaction_type not in INTERACTION_EFFECTS:
+    base_effect = INTERACTION_EFFECTS.get(interaction_type)
+    if base_effect is None:
         return 1, f"未知互动类型: {interaction_type}"
     
-    base_effect = INTERACTION_EFFECTS[interaction_type]
-    base_change = base_effect["change"]
-    description = base_effect["description"]
-    
-    total_change = base_change
-    details = [f"基础{description}: {base_change:+d}"]
+    total_change = base_effect["change"]
+    details = [_BASE_EFFECT_DETAILS[interaction_type]]
     
     # 应用条件修正
     if conditions:
+        effect_conditions = base_effect["conditions"]
         for condition, active in conditions.items():
-            if active and condition in base_effect["conditions"]:
-                modifier = base_effect["conditions"][condition]
-                total_change += modifier
-                details.append(f"{condition}: {modifier:+d}")
+            if active:
+                modifier = effect_conditions.get(condition)
+                if modifier is not None:
+                    total_change += modifier
+                    details.append(_CONDITION_DETAILS[interaction_type, condition])
     
     return total_change, " | ".join(details)
+
+# 互动条件位标志：update_social_network 用位掩码表示成立的条件，按掩码直接查表
+# 名称顺序即说明文本中各条件的先后顺序
+CONDITION_FLAG_NAMES = ("同地点", "相同职业", "首次交流", "私密场所", "高关系基础")
+(FLAG_SAME_LOCATION, FLAG_SAME_PROFESSION, FLAG_FIRST_INTERACTION,
+ FLAG_PRIVATE_LOCATION, FLAG_HIGH_RELATIONSHIP) = (1 << i for i in range(len(CONDITION_FLAG_NAMES)))
+
+# 每种互动在所有条件组合下的 (变化值, 详细说明)，以位掩码为下标
+_INTERACTION_EFFECT_TABLES = {
+    interaction_type: tuple(
+        calculate_interaction_effect(interaction_type, {
+            name: bool(flags & (1 << i)) for i, name in enumerate(CONDITION_FLAG_NAMES)
+        })
+        for flags in range(1 << len(CONDITION_FLAG_NAMES))
+    )
+    for interaction_type in INTERACTION_EFFECTS
+}
+
+def calculate_interaction_effect_flags(interaction_type: str, flags: int = 0) -> tuple:
+    """
+    按条件位掩码计算互动效果（结果与 calculate_interaction_effect 一致，直接查预计算表）
+    返回 (变化值, 详细说明)
+    """
+    table = _INTERACTION_EFFECT_TABLES.get(interaction_type)
+    if table is None:
+        return 1, f"未知互动类型: {interaction_type}"
+    return table[flags]
@@ -59,10 +59,13 @@ VECTOR_DB_CONFIG = {
     "retry_delay": 1.0,
     "connection_timeout": 10,
     "max_retries": 5,
+    "connection_check_interval": 30,  # 写操作前连接检查的最小间隔（秒）
     
     # 集合配置
     "vector_size": 512,  # 向量维度
     "distance_metric": "cosine",  # 距离度量
+    "scalar_quantization": True,  # 向量int8量化（内存约1/4），检索时用原始向量重排
+    "duplicate_threshold": 0.95,  # 新记忆与已有记忆相似度超过该值时不再插入
     
     # 性能配置
     "batch_size": 100,
@@ -92,6 +95,14 @@ AGENT_CONFIG = {
     "max_generation_retries": 2,
 }
 
+# 语义回应缓存配置
+RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "similarity_threshold": 0.92,  # 情境相似度高于此值时复用回应
+    "max_entries": 256,            # 每个Agent的最大缓存条目数
+    "ttl_seconds": 600,            # 缓存有效期，避免长期重复同一句话
+}
+
 # 复杂度阈值
 COMPLEXITY_THRESHOLDS = {
     "programmer": 0.3,
@@ -55,17 +55,21 @@ class AgentManager:
                 print(f"可用地点: {', '.join(buildings.keys())}")
                 return False
             
-            # 线程安全地访问和修改Agent
+            # 线程安全地访问和修改Agent（safe_agent_access已持有agents_lock）
             with self.thread_manager.safe_agent_access(agents, agent_name) as agent:
                 old_location = agent.location
                 
-                # 原子性地更新位置
-                with self.thread_manager.agents_lock:
-                    agent.location = location
-                    
-                    # 更新真实Agent的位置
-                    if hasattr(agent, 'real_agent'):
-                        agent.real_agent.current_location = location
+                # 已在目标地点：无需更新建筑、热度和移动记录
+                if old_location == location:
+                    if show_output:
+                        print(f"{TerminalColors.YELLOW}{agent.emoji} {agent_name} 已经在 {location}{TerminalColors.END}")
+                    return True
+                
+                agent.location = location
+                
+                # 更新真实Agent的位置
+                if hasattr(agent, 'real_agent'):
+                    agent.real_agent.current_location = location
                 
                 # 更新建筑物状态
                 self.thread_manager.safe_building_update(buildings, agent_name, old_location, location)
@@ -94,19 +98,15 @@ class AgentManager:
         try:
             def update_popularity():
                 with self.thread_manager.social_lock:
-                    # 降低旧地点热度
+                    # 降低旧地点热度（经由behavior_manager更新，定时保存才会写入变更）
                     if old_location in behavior_manager.location_popularity:
-                        current = behavior_manager.location_popularity[old_location]
-                        behavior_manager.location_popularity[old_location] = max(0, current - 2)
+                        behavior_manager.update_location_popularity(old_location, -2)
                     
-                    # 提高新地点热度
-                    if new_location not in behavior_manager.location_popularity:
-                        behavior_manager.location_popularity[new_location] = 50
-                    current = behavior_manager.location_popularity[new_location]
-                    behavior_manager.location_popularity[new_location] = min(100, current + 3)
+                    # 提高新地点热度（未记录的地点从50开始）
+                    behavior_manager.update_location_popularity(new_location, 3)
             
             # 在线程池中执行
-            self.thread_manager.submit_task(update_popularity)
+            self.thread_manager.submit_background_task(update_popularity)
             
         except Exception as e:
             logger.error(f"异步更新地点热度失败: {e}")
@@ -19,6 +19,28 @@ from collections import OrderedDict  # 新增缓存结构
 
 logger = logging.getLogger(__name__)
 
+# 响应清理用的预编译正则和关键词（每条模型回应都会经过clean_response）
+_HAS_CN_RE = re.compile(r"[\u4e00-\u9fff]")
+_INSTRUCTION_LEAK_RE = re.compile(r"(提示|指令|请用中文|不要|系统|身份|分析|注释)")
+_SENT_SPLIT_RE = re.compile(r'[。！？\n]')
+_EN_CHAR_RE = re.compile(r'[A-Za-z]')
+_LONG_EN_RE = re.compile(r'[a-zA-Z]{20,}')
+_TALKING_TO_RE = re.compile(r'你正在与.+?交谈。?')
+_CORE_PUNCT_RE = re.compile(r'[。！？，,.!\s]')
+_QUOTE_NL_RE = re.compile(r'[\n"“”]')
+_TRAILING_INSTR_RE = re.compile(r'(请用中文回答|不要解释|不要分析|只用一句话|回应要求.*)$')
+_AGENT_NAMES = ('Mike', 'John', 'Emma', 'Lisa', 'Sarah', 'Alex', 'David', 'Anna', 'Tom')
+_SKIP_CONTAINS = ('交谈', '情况下', '根据', '注释', '展示', '表情符号', '增加互动性', '趣味性', '特点')
+_CODE_TOKENS = ('```', 'def ', 'import ', 'python', 'pass')
+# 解说/元描述类片段：句子带有这些片段说明是在分析回应而不是回应本身
+_META_FRAGMENTS = (
+    '这句话既表达', '体现了', '巧妙地', '不仅', '融入了', '透露了', '既', '也', '表达了', '方式',
+    '展示了', '风格', '主题', '人生哲理', '礼貌地', '问候', '特点'
+)
+# 以上"包含即丢弃"的关键词合并为一个正则，每个句子只扫描一遍
+_SENTENCE_REJECT_RE = re.compile('|'.join(map(re.escape, _SKIP_CONTAINS + _CODE_TOKENS + _META_FRAGMENTS)))
+_AGENT_NAME_RE = re.compile('|'.join(_AGENT_NAMES))
+
 @dataclass
 class ContextTemplate:
     """上下文模板"""
@@ -77,11 +99,6 @@ class AdvancedContextEngine:
             r"根据.*情况.*",
         ]
         self._compiled_remove_patterns = [re.compile(p, re.IGNORECASE) for p in self._remove_patterns_raw]
-        # 元分析判定使用片段匹配提升性能
-        self._meta_fragments = (
-            '这句话既表达', '体现了', '巧妙地', '不仅', '融入了', '透露了', '既', '也', '表达了', '方式',
-            '展示了', '风格', '主题', '人生哲理', '礼貌地', '问候', '特点'
-        )
         # 简单LRU缓存（最多1024条）
         self._clean_cache: OrderedDict[str, str] = OrderedDict()
         self._clean_cache_limit = 1024
@@ -510,8 +527,8 @@ class AdvancedContextEngine:
         raw_original = response
         original = response.strip()
         # 纯中文简短自然句直接返回（避免被规则误杀）
-        if 3 <= len(original) <= 25 and re.search(r"[\u4e00-\u9fff]", original) \
-           and not re.search(r"(提示|指令|请用中文|不要|系统|身份|分析|注释)", original):
+        if 3 <= len(original) <= 25 and _HAS_CN_RE.search(original) \
+           and not _INSTRUCTION_LEAK_RE.search(original):
             if not original.endswith(('。','！','？')):
                 original += '。'
             return original
@@ -530,11 +547,8 @@ class AdvancedContextEngine:
         if (cleaned.startswith(("\"", '“', "'")) and cleaned[-1:] in ('"', '”', "'")):
             cleaned = cleaned[1:-1]
 
-        sentences = re.split(r'[。！？\n]', cleaned)
+        sentences = _SENT_SPLIT_RE.split(cleaned)
         valid = []
-        name_block = ('Mike','John','Emma','Lisa','Sarah','Alex','David','Anna','Tom')
-        skip_contains = ('交谈','情况下','根据','注释','展示','表情符号','增加互动性','趣味性','特点')
-        code_tokens = ('```','def ','import ','python','pass')
 
         for sent in sentences[:10]:
             s = sent.strip()
@@ -543,18 +557,14 @@ class AdvancedContextEngine:
             total = len(s)
             if total == 0:
                 continue
-            english_chars = len(re.findall(r'[A-Za-z]', s))
+            english_chars = len(_EN_CHAR_RE.findall(s))
             if total > 0 and english_chars/total > 0.7:
                 continue
             if s.startswith(('请注意','请记住','如果','当然可以','好的我来','我会帮助','你正在','根据','注释','这里')):
                 continue
-            if any(k in s for k in skip_contains):
-                continue
-            if any(k in s for k in code_tokens):
-                continue
-            if ':' in s and any(n in s for n in name_block):
+            if _SENTENCE_REJECT_RE.search(s):
                 continue
-            if any(frag in s for frag in self._meta_fragments):
+            if ':' in s and _AGENT_NAME_RE.search(s):
                 continue
             if '很高兴听到' in s and any('很高兴听到' in v for v in valid):
                 continue
@@ -570,19 +580,19 @@ class AdvancedContextEngine:
                 cleaned += '。'
         else:
             # 回退：保留原始中文骨架
-            chinese_core = re.sub(r'[a-zA-Z]{20,}', '', original)
-            chinese_core = re.sub(r'你正在与.+?交谈。?', '', chinese_core)
+            chinese_core = _LONG_EN_RE.sub('', original)
+            chinese_core = _TALKING_TO_RE.sub('', chinese_core)
             cleaned = chinese_core.strip()[:80] or "嗯，我明白了。"
             if not cleaned.endswith(('。','！','？')):
                 cleaned += '。'
 
         # 二次回退：若结果仍过短（<3个汉字或只含姓名/标点）
-        core_no_punct = re.sub(r'[。！？，,.!\s]','', cleaned)
+        core_no_punct = _CORE_PUNCT_RE.sub('', cleaned)
         if len(core_no_punct) < 3:
-            alt = re.sub(r'[\n"“”]','', original)
-            alt = re.sub(r'(请用中文回答|不要解释|不要分析|只用一句话|回应要求.*)$','', alt)
+            alt = _QUOTE_NL_RE.sub('', original)
+            alt = _TRAILING_INSTR_RE.sub('', alt)
             alt = alt.strip('：: ,，。 ')
-            if len(alt) >= 3 and re.search(r'[\u4e00-\u9fff]', alt):
+            if len(alt) >= 3 and _HAS_CN_RE.search(alt):
                 if not alt.endswith(('。','！','？')):
                     alt += '。'
                 cleaned = alt
@@ -607,7 +617,7 @@ class AdvancedContextEngine:
         quality_checks = [
             len(response) >= 3,                    # 最小长度
             len(response) <= 200,                  # 最大长度
-            not re.search(r'[A-Za-z]{20,}', response),  # 没有长英文
+            not _LONG_EN_RE.search(response),  # 没有长英文
             not any(word in response for word in ['Human=', 'Woman=', 'Student=', 'Teacher=']),  # 没有数据残留
             response.count('。') <= 3,             # 句子数量合理
         ]
@@ -152,7 +152,7 @@ class ErrorHandler:
     def error_context(self, operation: str, category: ErrorCategory = ErrorCategory.SYSTEM, 
                      severity: ErrorSeverity = ErrorSeverity.MEDIUM, **context):
         """错误处理上下文管理器"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             yield
         except Exception as e:
@@ -163,7 +163,7 @@ class ErrorHandler:
                 'severity': severity,
                 'exception': e,
                 'context': context,
-                'duration': time.time() - start_time
+                'duration': time.perf_counter() - start_time
             }
             
             self.handle_error(error_info)
@@ -13,8 +13,35 @@ from pathlib import Path
 import threading
 import time
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时使用标准库json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+
+def write_json(file_path, data) -> None:
+    """写入JSON文件（优先使用orjson，直接输出UTF-8字节）：先写临时文件再替换，中途失败不会损坏原文件"""
+    tmp_path = f"{os.fspath(file_path)}.tmp"
+    if orjson is not None:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
+
+
+def read_json(file_path) -> Any:
+    """读取JSON文件（优先使用orjson）"""
+    if orjson is not None:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 class PersistenceManager:
     """持久化管理器"""
     
@@ -41,6 +68,7 @@ class PersistenceManager:
         # 数据缓存
         self._cached_data = {}
         self._last_save_time = {}
+        self._profile_snapshots = {}  # 各Agent上次写入档案文件时的状态（不含时间戳）
         
         logger.info(f"持久化管理器初始化完成，数据目录: {self.data_dir}")
     
@@ -203,14 +231,16 @@ class PersistenceManager:
                 agent_data[name] = agent_info
             
             file_path = self.cache_dir / "agent_states.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(agent_data, f, ensure_ascii=False, indent=2)
+            write_json(file_path, agent_data)
             
-            # 同时保存到agent_profiles目录
+            # 同时保存到agent_profiles目录：只重写状态有变化的Agent档案
             for name, data in agent_data.items():
+                snapshot = {key: value for key, value in data.items() if key != 'last_updated'}
+                if self._profile_snapshots.get(name) == snapshot:
+                    continue
                 profile_file = self.agent_profiles_dir / f"{name}.json"
-                with open(profile_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                write_json(profile_file, data)
+                self._profile_snapshots[name] = snapshot
             
             return True
             
@@ -237,8 +267,7 @@ class PersistenceManager:
                 network_data['interaction_history'] = social_network.interaction_history[-1000:]  # 保留最近1000条
             
             file_path = self.cache_dir / "social_network.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(network_data, f, ensure_ascii=False, indent=2)
+            write_json(file_path, network_data)
             
             return True
             
@@ -262,8 +291,7 @@ class PersistenceManager:
                 }
             
             file_path = self.cache_dir / "buildings_state.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(buildings_data, f, ensure_ascii=False, indent=2)
+            write_json(file_path, buildings_data)
             
             return True
             
@@ -284,8 +312,7 @@ class PersistenceManager:
             }
             
             file_path = self.cache_dir / "chat_history.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(chat_data, f, ensure_ascii=False, indent=2)
+            write_json(file_path, chat_data)
             
             return True
             
@@ -307,8 +334,7 @@ class PersistenceManager:
             }
             
             file_path = self.cache_dir / "system_config.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
+            write_json(file_path, config_data)
             
             return True
             
@@ -356,8 +382,7 @@ class PersistenceManager:
             
             # 保存到文件
             file_path = self.cache_dir / "memory_data.json" 
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(memory_info, f, ensure_ascii=False, indent=2)
+            write_json(file_path, memory_info)
             
             return True
             
@@ -378,8 +403,7 @@ class PersistenceManager:
             backup_filename = f"vector_db_backup_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
             backup_path = self.backup_dir / backup_filename
             
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, ensure_ascii=False, indent=2)
+            write_json(backup_path, backup_data)
             
             logger.debug(f"向量数据库元数据备份完成: {backup_filename}")
             
@@ -399,8 +423,7 @@ class PersistenceManager:
             }
             
             snapshot_file = self.backup_dir / f"snapshot_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
-            with open(snapshot_file, 'w', encoding='utf-8') as f:
-                json.dump(snapshot_data, f, ensure_ascii=False, indent=2)
+            write_json(snapshot_file, snapshot_data)
             
             # 清理旧快照
             self._cleanup_old_backups()
@@ -436,8 +459,7 @@ class PersistenceManager:
             if not file_path.exists():
                 return {}
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(file_path)
         except Exception as e:
             logger.error(f"加载Agent状态失败: {e}")
             return {}
@@ -449,8 +471,7 @@ class PersistenceManager:
             if not file_path.exists():
                 return {}
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(file_path)
         except Exception as e:
             logger.error(f"加载社交网络失败: {e}")
             return {}
@@ -462,8 +483,7 @@ class PersistenceManager:
             if not file_path.exists():
                 return {}
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(file_path)
         except Exception as e:
             logger.error(f"加载建筑物状态失败: {e}")
             return {}
@@ -475,9 +495,8 @@ class PersistenceManager:
             if not file_path.exists():
                 return []
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('history', [])
+            data = read_json(file_path)
+            return data.get('history', [])
         except Exception as e:
             logger.error(f"加载聊天历史失败: {e}")
             return []
@@ -489,8 +508,7 @@ class PersistenceManager:
             if not file_path.exists():
                 return {}
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(file_path)
         except Exception as e:
             logger.error(f"加载系统配置失败: {e}")
             return {}
@@ -502,8 +520,7 @@ class PersistenceManager:
             if not file_path.exists():
                 return {}
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json(file_path)
         except Exception as e:
             logger.error(f"加载内存数据失败: {e}")
             return {}
@@ -532,8 +549,7 @@ class PersistenceManager:
                 'saved_at': timestamp.isoformat()
             }
             
-            with open(interaction_file, 'w', encoding='utf-8') as f:
-                json.dump(interaction_record, f, ensure_ascii=False, indent=2)
+            write_json(interaction_file, interaction_record)
             
             # 清理旧交互文件
             self._cleanup_old_interactions()
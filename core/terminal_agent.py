@@ -81,7 +81,7 @@ class TerminalAgent:
             
             # 调用真实Agent的响应方法
             if hasattr(self.real_agent, 'think_and_respond'):
-                response = self.real_agent.think_and_respond(message)
+                response = self.real_agent.think_and_respond(message, use_cache=True)
             elif hasattr(self.real_agent, 'respond'):
                 response = self.real_agent.respond(message)
             else:
@@ -93,12 +93,13 @@ class TerminalAgent:
             logger.error(f"{self.name}响应消息失败: {e}")
             return f"*{self.name}遇到了一些技术问题，暂时无法很好地回应*"
     
-    def think_and_respond(self, situation: str) -> str:
+    def think_and_respond(self, situation: str, use_cache: bool = False) -> str:
         """
         思考并回应特定情况
         
         Args:
             situation: 当前情况描述
+            use_cache: 是否使用语义回应缓存（仅用户对话使用）
             
         Returns:
             Agent的思考结果
@@ -107,7 +108,7 @@ class TerminalAgent:
             self._last_action = '思考中'
             
             if hasattr(self.real_agent, 'think_and_respond'):
-                return self.real_agent.think_and_respond(situation)
+                return self.real_agent.think_and_respond(situation, use_cache=use_cache)
             else:
                 return self._generate_thinking_response(situation)
                 
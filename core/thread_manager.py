@@ -21,17 +21,20 @@ class ThreadManager:
         self._chat_lock = Lock()             # 聊天历史的保护锁
         self._social_lock = Lock()           # 社交网络的保护锁
         self._simulation_lock = Lock()       # 自动模拟的控制锁
-        self._vector_db_lock = Lock()        # 向量数据库写入锁
         self._buildings_lock = Lock()        # 建筑物状态锁
         
         # 并发控制
         self._shutdown_event = Event()       # 优雅关闭信号
         self._simulation_condition = Condition(self._simulation_lock)
+        # 分级线程池：用户交互 > Agent模拟 > 后台状态维护，互不排队
+        self._interactive_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="TownInteractive")
         self._thread_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="TownAgent")
+        self._background_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="TownBackground")
         
         # 异步操作队列
         self._memory_save_queue = queue.Queue(maxsize=100)
         self._interaction_queue = queue.Queue(maxsize=50)
+        self._memory_batch_size = 32         # 单次合并处理的最大内存任务数
         
         # 工作线程
         self._memory_worker = None
@@ -67,10 +70,30 @@ class ThreadManager:
                 task = self._memory_save_queue.get(timeout=1.0)
                 if task is None:  # 关闭信号
                     break
-                    
+                
+                # 顺带取走队列中已积压的任务，合并成一批处理
+                batch = [task]
+                stop = False
+                while len(batch) < self._memory_batch_size:
+                    try:
+                        pending = self._memory_save_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if pending is None:
+                        stop = True
+                        self._memory_save_queue.task_done()
+                        break
+                    batch.append(pending)
+                
                 # 批量处理内存保存任务
-                memory_save_func([task])
-                self._memory_save_queue.task_done()
+                try:
+                    memory_save_func(batch)
+                finally:
+                    for _ in batch:
+                        self._memory_save_queue.task_done()
+                
+                if stop:
+                    break
                 
             except queue.Empty:
                 continue
@@ -117,25 +140,34 @@ class ThreadManager:
                 agent1_name, agent2_name, interaction_type, context
             )
     
+    def safe_social_update_batch(self, behavior_manager, updates: list):
+        """线程安全的批量社交网络更新（整批只加一次锁）"""
+        with self._social_lock:
+            return behavior_manager.update_social_network_batch(updates)
+    
     def safe_building_update(self, buildings, agent_name: str, old_location: str, new_location: str):
         """线程安全的建筑物状态更新"""
         with self._buildings_lock:
-            # 从旧位置移除
+            # 从旧位置移除（occupants为集合，增删都是O(1)）
             if old_location in buildings:
-                occupants = buildings[old_location]['occupants']
-                if agent_name in occupants:
-                    occupants.remove(agent_name)
+                buildings[old_location]['occupants'].discard(agent_name)
             
             # 添加到新位置
             if new_location in buildings:
-                occupants = buildings[new_location]['occupants']
-                if agent_name not in occupants:
-                    occupants.append(agent_name)
+                buildings[new_location]['occupants'].add(agent_name)
     
     def submit_task(self, func, *args, **kwargs):
-        """向线程池提交任务"""
+        """向线程池提交任务（Agent模拟级别）"""
         return self._thread_pool.submit(func, *args, **kwargs)
     
+    def submit_interactive_task(self, func, *args, **kwargs):
+        """提交面向用户的任务，不会排在自动模拟的长任务之后"""
+        return self._interactive_pool.submit(func, *args, **kwargs)
+    
+    def submit_background_task(self, func, *args, **kwargs):
+        """提交轻量的后台状态维护任务（精力、心情、地点热度等）"""
+        return self._background_pool.submit(func, *args, **kwargs)
+    
     def add_memory_task(self, task):
         """添加内存保存任务"""
         try:
@@ -189,10 +221,11 @@ class ThreadManager:
             self._interaction_worker.join(timeout=5.0)
         
         # 关闭线程池
-        try:
-            self._thread_pool.shutdown(wait=True)
-        except Exception as e:
-            logger.warning(f"关闭线程池异常: {e}")
+        for pool in (self._interactive_pool, self._thread_pool, self._background_pool):
+            try:
+                pool.shutdown(wait=True)
+            except Exception as e:
+                logger.warning(f"关闭线程池异常: {e}")
         
         logger.info("线程管理器已安全关闭")
     
@@ -212,7 +245,4 @@ class ThreadManager:
     @property
     def buildings_lock(self):
         return self._buildings_lock
-    
-    @property
-    def vector_db_lock(self):
-        return self._vector_db_lock
+
@@ -36,8 +36,8 @@ class MemoryCleaner:
         }
         
         # 状态跟踪
-        self._last_memory_cleanup = 0
-        self._last_vector_cleanup = 0
+        self._last_memory_cleanup = float('-inf')
+        self._last_vector_cleanup = float('-inf')
         self._cleanup_stats = {
             'total_cleanups': 0,
             'memories_cleaned': 0,
@@ -80,7 +80,7 @@ class MemoryCleaner:
         """后台清理工作线程"""
         while not self._shutdown_event.is_set():
             try:
-                current_time = time.time()
+                current_time = time.monotonic()  # 只用于计算间隔，不受系统时钟调整影响
                 
                 # 检查是否需要内存清理
                 if (current_time - self._last_memory_cleanup) >= self.cleanup_config['memory_cleanup_interval']:
@@ -1,5 +1,7 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import heapq
 import logging
 import time
 from .vector_store import get_vector_store
@@ -20,12 +22,18 @@ class MemoryManager:
         self.vector_store = get_vector_store()
         self.collection_name = f"agent_{agent_id}_memories"
         
-        # 添加简单缓存机制
-        self._memory_cache = {}
+        # 添加简单缓存机制（有界LRU，超出容量时淘汰最久未用的条目）
+        self._memory_cache = OrderedDict()
+        self._cache_max_entries = 128
         self._cache_timeout = 300  # 5分钟缓存
-        self._last_query_time = 0
+        self._last_query_time = float('-inf')
         self._query_interval = 10  # 至少间隔10秒才能查询
         
+        # 最近经历缓存：(hours, limit) -> (写入代数, 时间戳, 结果)，有新记忆写入时失效
+        self._recent_cache = {}
+        self._recent_cache_ttl = 60
+        self._write_generation = 0
+        
         # 创建该Agent的记忆集合
         self.vector_store.create_collection(self.collection_name)
         
@@ -67,9 +75,40 @@ class MemoryManager:
             metadata=metadata or {}
         )
         
+        self._invalidate_recent_cache()
         logger.debug(f"添加记忆: {memory_type} - {content[:50]}...")
         return memory_id
     
+    def add_memories(self, items: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        批量添加记忆，一次嵌入批处理 + 一次写库
+        Args:
+            items: 每项包含 content，可选 memory_type / base_importance / metadata
+        Returns:
+            记忆ID列表
+        """
+        memories = []
+        for item in items:
+            memory_type = item.get("memory_type", "experience")
+            memories.append({
+                "content": item["content"],
+                "memory_type": memory_type,
+                "importance": self._evaluate_importance(
+                    item["content"], memory_type, item.get("base_importance", 0.5)
+                ),
+                "metadata": item.get("metadata") or {}
+            })
+        
+        memory_ids = self.vector_store.add_memories(
+            collection_name=self.collection_name,
+            memories=memories,
+            agent_id=self.agent_id
+        )
+        
+        self._invalidate_recent_cache()
+        logger.debug(f"批量添加记忆: {len(memories)}条")
+        return memory_ids
+    
     def retrieve_memories(self, 
                          query: str, 
                          memory_types: List[str] = None,
@@ -86,7 +125,7 @@ class MemoryManager:
             相关记忆列表
         """
         # 检查缓存和查询频率限制
-        current_time = time.time()
+        current_time = time.monotonic()
         cache_key = f"{query}_{memory_types}_{limit}_{min_importance}"
         
         # 如果太频繁查询，返回缓存或简单结果
@@ -94,6 +133,7 @@ class MemoryManager:
             if cache_key in self._memory_cache:
                 cache_data = self._memory_cache[cache_key]
                 if current_time - cache_data['timestamp'] < self._cache_timeout:
+                    self._memory_cache.move_to_end(cache_key)
                     logger.debug(f"使用缓存记忆: {query[:20]}...")
                     return cache_data['memories']
             
@@ -106,17 +146,15 @@ class MemoryManager:
         
         try:
             if memory_types:
-                # 分别搜索不同类型的记忆
-                for mem_type in memory_types:
-                    memories = self.vector_store.search_memories(
-                        collection_name=self.collection_name,
-                        query=query,
-                        agent_id=self.agent_id,
-                        limit=limit,
-                        min_importance=min_importance,
-                        memory_type=mem_type
-                    )
-                    all_memories.extend(memories)
+                # 每种类型各取最多limit条候选：一次嵌入、一次批量搜索，而不是每种类型各查一遍
+                all_memories = self.vector_store.search_memories(
+                    collection_name=self.collection_name,
+                    query=query,
+                    agent_id=self.agent_id,
+                    limit=limit,
+                    min_importance=min_importance,
+                    memory_type=list(memory_types)
+                )
             else:
                 # 搜索所有类型
                 all_memories = self.vector_store.search_memories(
@@ -127,25 +165,46 @@ class MemoryManager:
                     min_importance=min_importance
                 )
             
-            # 重新计算记忆分数并排序
-            scored_memories = self._score_memories(all_memories, query)
+            # 重新计算记忆分数，只取前N个最相关的记忆
+            scored_memories = self._score_memories(all_memories, query, limit)
             
             # 缓存结果
             self._memory_cache[cache_key] = {
-                'memories': scored_memories[:limit],
+                'memories': scored_memories,
                 'timestamp': current_time
             }
+            self._memory_cache.move_to_end(cache_key)
+            while len(self._memory_cache) > self._cache_max_entries:
+                self._memory_cache.popitem(last=False)
             
-            # 返回前N个最相关的记忆
-            return scored_memories[:limit]
+            return scored_memories
             
         except Exception as e:
             logger.error(f"记忆检索失败: {e}")
             return []
     
+    @property
+    def write_generation(self) -> int:
+        """记忆写入代数，每次写入后递增，可用于判断依赖记忆的缓存是否过期"""
+        return self._write_generation
+    
+    def _invalidate_recent_cache(self):
+        """有新记忆写入，最近经历缓存失效"""
+        self._write_generation += 1
+        self._recent_cache.clear()
+    
     def get_recent_experiences(self, hours: int = 24, limit: int = 10) -> List[Dict[str, Any]]:
-        """获取最近的经历"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        """获取最近的经历（60秒内且无新写入时直接返回缓存）"""
+        cache_key = (hours, limit)
+        now = time.monotonic()
+        cached = self._recent_cache.get(cache_key)
+        if cached is not None:
+            generation, cached_at, recent_memories = cached
+            if generation == self._write_generation and now - cached_at < self._recent_cache_ttl:
+                return recent_memories
+        
+        generation = self._write_generation
+        cutoff_time = (datetime.now() - timedelta(hours=hours)).isoformat()
         
         memories = self.vector_store.search_memories(
             collection_name=self.collection_name,
@@ -155,14 +214,16 @@ class MemoryManager:
             memory_type="experience"
         )
         
-        # 过滤时间并按时间排序
-        recent_memories = []
-        for memory in memories:
-            memory_time = datetime.fromisoformat(memory["timestamp"])
-            if memory_time >= cutoff_time:
-                recent_memories.append(memory)
+        # 过滤时间并按时间排序（ISO时间戳可直接按字符串比较，无需逐条解析）
+        recent_memories = sorted(
+            (memory for memory in memories if memory["timestamp"] >= cutoff_time),
+            key=lambda x: x["timestamp"], reverse=True
+        )
         
-        return sorted(recent_memories, key=lambda x: x["timestamp"], reverse=True)
+        # 查询期间若有新写入，结果可能已过时，不写入缓存
+        if generation == self._write_generation:
+            self._recent_cache[cache_key] = (generation, now, recent_memories)
+        return recent_memories
     
     def get_memory_summary(self) -> Dict[str, Any]:
         """获取记忆摘要"""
@@ -219,8 +280,9 @@ class MemoryManager:
         # 限制在0-1范围内
         return max(0.0, min(1.0, importance))
     
-    def _score_memories(self, memories: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
-        """重新计算记忆综合分数"""
+    def _score_memories(self, memories: List[Dict[str, Any]], query: str,
+                        limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """重新计算记忆综合分数，指定limit时只返回分数最高的limit条"""
         current_time = datetime.now()
         
         for memory in memories:
@@ -239,7 +301,9 @@ class MemoryManager:
             
             memory["final_score"] = final_score
         
-        # 按综合分数排序
+        # 按综合分数排序；只需要前limit条时用堆选取，避免全量排序
+        if limit is not None and limit < len(memories):
+            return heapq.nlargest(limit, memories, key=lambda x: x["final_score"])
         return sorted(memories, key=lambda x: x["final_score"], reverse=True)
 
 # 全局记忆管理器缓存
@@ -0,0 +1,153 @@
+"""
+语义回应缓存
+对相似情境（向量余弦相似度高于阈值）直接复用之前的模型回应，避免重复推理
+"""
+
+import threading
+import time
+import logging
+from typing import Hashable, Optional
+
+import numpy as np
+
+from config.settings import RESPONSE_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """单个Agent的语义回应缓存 - 向量矩阵 + 一次矩阵向量乘完成相似度查找"""
+
+    def __init__(self,
+                 dimension: int,
+                 similarity_threshold: float = None,
+                 max_entries: int = None,
+                 ttl_seconds: float = None):
+        """
+        Args:
+            dimension: 嵌入向量维度
+            similarity_threshold: 命中所需的最小余弦相似度
+            max_entries: 最大缓存条目数，超出时淘汰最久未命中的条目
+            ttl_seconds: 条目有效期（秒）
+        """
+        self.dimension = dimension
+        self.similarity_threshold = (RESPONSE_CACHE_CONFIG["similarity_threshold"]
+                                     if similarity_threshold is None else similarity_threshold)
+        self.max_entries = RESPONSE_CACHE_CONFIG["max_entries"] if max_entries is None else max_entries
+        self.ttl_seconds = RESPONSE_CACHE_CONFIG["ttl_seconds"] if ttl_seconds is None else ttl_seconds
+
+        # 预分配容量，按需翻倍，避免每次插入都重新分配
+        self._capacity = min(16, self.max_entries)
+        self._matrix = np.zeros((self._capacity, dimension), dtype=np.float32)
+        self._size = 0
+        self._responses = []
+        self._tags = []
+        self._created_at = np.zeros(self._capacity, dtype=np.float64)
+        self._last_used = np.zeros(self._capacity, dtype=np.float64)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> Optional[np.ndarray]:
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None  # 嵌入失败时返回的零向量不参与缓存
+        return vector / norm
+
+    def lookup(self, embedding: np.ndarray, tag: Hashable = None) -> Optional[str]:
+        """
+        查找相似情境的缓存回应
+        Args:
+            embedding: 情境的嵌入向量
+            tag: 附加匹配条件（如地点、心情），只有tag相同的条目才可命中
+        Returns:
+            命中时返回缓存回应，否则返回None
+        """
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            if self._size == 0:
+                self.misses += 1
+                return None
+
+            now = time.monotonic()
+            sims = self._matrix[:self._size] @ query
+            # 过期条目和tag不一致的条目不参与比较
+            sims[now - self._created_at[:self._size] > self.ttl_seconds] = -1.0
+            if tag is not None:
+                for i, entry_tag in enumerate(self._tags):
+                    if entry_tag != tag:
+                        sims[i] = -1.0
+
+            best = int(np.argmax(sims))
+            if sims[best] >= self.similarity_threshold:
+                self._last_used[best] = now
+                self.hits += 1
+                return self._responses[best]
+
+            self.misses += 1
+            return None
+
+    def store(self, embedding: np.ndarray, response: str, tag: Hashable = None):
+        """缓存一条情境-回应"""
+        vector = self._normalize(embedding)
+        if vector is None or not response or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._size >= self.max_entries:
+                # 优先淘汰已过期的条目（最早创建的），没有过期条目时淘汰最久未使用的（原地覆盖）
+                created_at = self._created_at[:self._size]
+                if now - created_at.min() > self.ttl_seconds:
+                    index = int(np.argmin(created_at))
+                else:
+                    index = int(np.argmin(self._last_used[:self._size]))
+            else:
+                if self._size == self._capacity:
+                    self._grow()
+                index = self._size
+                self._size += 1
+                self._responses.append(None)
+                self._tags.append(None)
+
+            self._matrix[index] = vector
+            self._responses[index] = response
+            self._tags[index] = tag
+            self._created_at[index] = now
+            self._last_used[index] = now
+
+    def _grow(self):
+        """容量翻倍（不超过max_entries）"""
+        new_capacity = min(self._capacity * 2, self.max_entries)
+        matrix = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        created_at = np.zeros(new_capacity, dtype=np.float64)
+        created_at[:self._size] = self._created_at[:self._size]
+        last_used = np.zeros(new_capacity, dtype=np.float64)
+        last_used[:self._size] = self._last_used[:self._size]
+        self._matrix, self._created_at, self._last_used = matrix, created_at, last_used
+        self._capacity = new_capacity
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._size = 0
+            self._responses.clear()
+            self._tags.clear()
+
+    def get_stats(self) -> dict:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "similarity_threshold": self.similarity_threshold,
+        }
@@ -326,7 +326,7 @@ class VectorDatabaseOptimizer:
         try:
             # 这里可以测量查询性能
             if self.vector_store.is_connected():
-                start_time = time.time()
+                start_time = time.perf_counter()
                 
                 # 执行一个测试查询来测量性能
                 try:
@@ -341,7 +341,7 @@ class VectorDatabaseOptimizer:
                             limit=5
                         )
                         
-                        query_time = (time.time() - start_time) * 1000
+                        query_time = (time.perf_counter() - start_time) * 1000
                         self.performance_stats['average_query_time_ms'] = query_time
                         stats_result['query_performance_measured'] = True
                         stats_result['query_time_ms'] = query_time
@@ -1,7 +1,14 @@
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
-from typing import List, Dict, Any, Optional
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue,
+    SetPayload, SetPayloadOperation, PayloadSchemaType,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType,
+    SearchParams, QuantizationSearchParams, SearchRequest
+)
+from typing import List, Dict, Any, Optional, Union
+from collections import Counter
 import uuid
+import numpy as np
 from datetime import datetime
 import logging
 import time
@@ -18,6 +25,10 @@ class VectorStore:
         self.client = None
         self.embedding_service = None
         self.dimension = None
+        self._indexed_collections = set()
+        # 连接检查节流：上次确认连接正常的时间，间隔内的写操作不再额外探测
+        self._last_connection_ok = float('-inf')
+        self._connection_check_interval = VECTOR_DB_CONFIG.get("connection_check_interval", 30)
         self._connect_with_retry()
         
     def _connect_with_retry(self):
@@ -181,11 +192,19 @@ class VectorStore:
                 'error': str(e)
             }
     
-    def reconnect_if_needed(self):
-        """在需要时重新连接"""
+    def reconnect_if_needed(self, force: bool = False):
+        """
+        在需要时重新连接
+        Args:
+            force: 忽略检查间隔立即探测（操作失败后使用）
+        """
+        now = time.monotonic()
+        if not force and now - self._last_connection_ok < self._connection_check_interval:
+            return
         if not self.is_connected():
             logger.warning("检测到连接断开，尝试重新连接...")
             self._connect_with_retry()
+        self._last_connection_ok = time.monotonic()
     
     def cleanup_old_memories(self, 
                            collection_name: str,
@@ -378,21 +397,61 @@ class VectorStore:
                 logger.info(f"删除已存在的集合: {collection_name}")
             
             if not collection_exists or recreate:
+                quantization_config = None
+                if VECTOR_DB_CONFIG.get("scalar_quantization", False):
+                    # int8标量量化：每个分量1字节，距离计算带宽降为1/4
+                    quantization_config = ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(
+                            type=ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True
+                        )
+                    )
                 self.client.create_collection(
                     collection_name=collection_name,
                     vectors_config=VectorParams(
                         size=self.dimension,
                         distance=Distance.COSINE
-                    )
+                    ),
+                    quantization_config=quantization_config
                 )
                 logger.info(f"创建集合成功: {collection_name}")
+            
+            self._ensure_payload_indexes(collection_name)
                 
         except Exception as e:
             logger.error(f"创建集合失败: {e}")
             # 尝试重新连接
-            self.reconnect_if_needed()
+            self.reconnect_if_needed(force=True)
             raise
     
+    # 量化索引上先粗排，再用原始float32向量对候选重排，保证召回率
+    _search_params = SearchParams(
+        quantization=QuantizationSearchParams(rescore=True, oversampling=2.0)
+    ) if VECTOR_DB_CONFIG.get("scalar_quantization", False) else None
+    
+    # 检索时常用的过滤字段：建立payload索引后，带过滤的KNN仍走HNSW索引而不是全量扫描
+    _PAYLOAD_INDEXES = (
+        ("agent_id", PayloadSchemaType.KEYWORD),
+        ("memory_type", PayloadSchemaType.KEYWORD),
+        ("importance", PayloadSchemaType.FLOAT),
+    )
+    
+    def _ensure_payload_indexes(self, collection_name: str):
+        """为过滤字段建立payload索引（每个集合每个进程只做一次）"""
+        if collection_name in self._indexed_collections:
+            return
+        for field_name, field_schema in self._PAYLOAD_INDEXES:
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+            except Exception as e:
+                logger.warning(f"创建payload索引失败 {collection_name}.{field_name}: {e}")
+        self._indexed_collections.add(collection_name)
+    
     def add_memory(self, 
                    collection_name: str, 
                    content: str, 
@@ -441,7 +500,7 @@ class VectorStore:
             logger.error(f"添加记忆失败: {e}")
             # 尝试重新连接后再试一次
             try:
-                self.reconnect_if_needed()
+                self.reconnect_if_needed(force=True)
                 # 这里可以重试一次添加操作
                 logger.info("重新连接后重试添加记忆...")
                 # 为了避免无限递归，这里返回None表示失败
@@ -449,13 +508,152 @@ class VectorStore:
                 pass
             return None
     
+    def add_memories(self,
+                     collection_name: str,
+                     memories: List[Dict[str, Any]],
+                     agent_id: str) -> List[Optional[str]]:
+        """
+        批量添加记忆：一次批量嵌入 + 一次upsert
+        Args:
+            memories: 每项包含 content，可选 importance / memory_type / metadata
+        Returns:
+            与输入顺序一致的记忆ID列表，失败时为None
+        """
+        if not memories:
+            return []
+        try:
+            # 确保连接正常
+            self.reconnect_if_needed()
+            
+            embeddings = self.embedding_service.encode_batch([m["content"] for m in memories])
+            timestamp = datetime.now().isoformat()
+            
+            # 与已有记忆几乎相同的条目不再插入，只累加原记忆的访问次数
+            duplicate_ids = self._find_duplicates(collection_name, memories, embeddings, agent_id)
+            batch_duplicates = self._find_batch_duplicates(memories, embeddings, duplicate_ids)
+            self._update_access_counts(collection_name, [d for d in duplicate_ids if d is not None])
+            
+            memory_ids = []
+            pending = []  # (记忆ID, 嵌入向量, payload)
+            payload_by_index = {}
+            for index, (memory, embedding, duplicate_id, original_index) in enumerate(
+                zip(memories, embeddings, duplicate_ids, batch_duplicates)
+            ):
+                if duplicate_id is not None:
+                    memory_ids.append(duplicate_id)
+                    continue
+                if original_index is not None:
+                    # 与本批中更早的一条记忆近似重复：不再插入，累加那条记忆的访问次数
+                    memory_ids.append(memory_ids[original_index])
+                    payload_by_index[original_index]["access_count"] += 1
+                    continue
+                memory_id = str(uuid.uuid4())
+                payload = {
+                    "content": memory["content"],
+                    "agent_id": agent_id,
+                    "importance": memory.get("importance", 0.5),
+                    "memory_type": memory.get("memory_type", "general"),
+                    "timestamp": timestamp,
+                    "access_count": 0
+                }
+                if memory.get("metadata"):
+                    payload.update(memory["metadata"])
+                memory_ids.append(memory_id)
+                payload_by_index[index] = payload
+                pending.append((memory_id, embedding, payload))
+            
+            points = [
+                PointStruct(id=memory_id, vector=embedding.tolist(), payload=payload)
+                for memory_id, embedding, payload in pending
+            ]
+            
+            # 分批写入，避免单个请求过大
+            batch_size = VECTOR_DB_CONFIG.get("batch_size", 100)
+            for i in range(0, len(points), batch_size):
+                self.client.upsert(collection_name=collection_name, points=points[i:i+batch_size])
+            
+            logger.debug(f"批量添加记忆成功: {len(points)}条，跳过重复{len(memories) - len(points)}条")
+            return memory_ids
+            
+        except Exception as e:
+            logger.error(f"批量添加记忆失败: {e}")
+            self._last_connection_ok = float('-inf')  # 下次写入前重新检查连接
+            return [None] * len(memories)
+    
+    def _find_duplicates(self,
+                         collection_name: str,
+                         memories: List[Dict[str, Any]],
+                         embeddings,
+                         agent_id: str) -> List[Optional[str]]:
+        """
+        查找与待写入记忆近似重复的已有记忆（同Agent、同类型、余弦相似度超过阈值）
+        所有查询合并为一次批量搜索，复用已经算好的嵌入向量
+        Returns:
+            与输入顺序一致的已有记忆ID列表，无重复时为None
+        """
+        threshold = VECTOR_DB_CONFIG.get("duplicate_threshold")
+        if not threshold:
+            return [None] * len(memories)
+        try:
+            requests = [
+                SearchRequest(
+                    vector=embedding.tolist(),
+                    filter=Filter(must=[
+                        FieldCondition(key="agent_id", match=MatchValue(value=agent_id)),
+                        FieldCondition(key="memory_type", match=MatchValue(value=memory.get("memory_type", "general"))),
+                    ]),
+                    limit=1,
+                    score_threshold=threshold,
+                    with_payload=False
+                )
+                for memory, embedding in zip(memories, embeddings)
+            ]
+            results = self.client.search_batch(collection_name=collection_name, requests=requests)
+            return [hits[0].id if hits else None for hits in results]
+        except Exception as e:
+            logger.debug(f"重复记忆检查失败: {e}")
+            return [None] * len(memories)
+    
+    @staticmethod
+    def _find_batch_duplicates(memories: List[Dict[str, Any]],
+                               embeddings,
+                               duplicate_ids: List[Optional[str]]) -> List[Optional[int]]:
+        """
+        查找本批待写入记忆之间的近似重复（同类型、余弦相似度超过阈值），复用已经算好的嵌入向量
+        Returns:
+            与输入顺序一致的下标列表：与之重复的、本批中更早的待插入记忆下标，无重复时为None
+        """
+        result = [None] * len(memories)
+        threshold = VECTOR_DB_CONFIG.get("duplicate_threshold")
+        if not threshold or len(memories) < 2:
+            return result
+        
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        similarity = vectors @ vectors.T
+        
+        kept = []  # 本批中将被插入的记忆下标
+        for i, memory in enumerate(memories):
+            if duplicate_ids[i] is not None:
+                continue
+            memory_type = memory.get("memory_type", "general")
+            for j in kept:
+                if similarity[i, j] >= threshold and memories[j].get("memory_type", "general") == memory_type:
+                    result[i] = j
+                    break
+            else:
+                kept.append(i)
+        return result
+    
     def search_memories(self, 
                        collection_name: str,
                        query: str,
                        agent_id: str = None,
                        limit: int = 5,
                        min_importance: float = 0.0,
-                       memory_type: str = None) -> List[Dict[str, Any]]:
+                       memory_type: Union[str, List[str]] = None) -> List[Dict[str, Any]]:
         """
         搜索相关记忆
         Args:
@@ -464,7 +662,7 @@ class VectorStore:
             agent_id: 特定Agent ID (可选)
             limit: 返回数量限制
             min_importance: 最小重要性阈值
-            memory_type: 记忆类型过滤
+            memory_type: 记忆类型过滤；传入列表时每种类型各取最多limit条，合并为一次批量搜索
         Returns:
             相关记忆列表
         """
@@ -485,22 +683,41 @@ class VectorStore:
                     FieldCondition(key="importance", range={"gte": min_importance})
                 )
             
-            if memory_type:
-                filter_conditions.append(
-                    FieldCondition(key="memory_type", match=MatchValue(value=memory_type))
+            if isinstance(memory_type, (list, tuple)):
+                # 每种类型单独过滤（保证各类型都有候选），共用查询向量，一次请求完成
+                query_vector = query_embedding.tolist()
+                requests = [
+                    SearchRequest(
+                        vector=query_vector,
+                        filter=Filter(must=filter_conditions + [
+                            FieldCondition(key="memory_type", match=MatchValue(value=mem_type))
+                        ]),
+                        params=self._search_params,
+                        limit=limit,
+                        with_payload=True
+                    )
+                    for mem_type in memory_type
+                ]
+                batch_results = self.client.search_batch(collection_name=collection_name, requests=requests)
+                results = [result for type_results in batch_results for result in type_results]
+            else:
+                if memory_type:
+                    filter_conditions.append(
+                        FieldCondition(key="memory_type", match=MatchValue(value=memory_type))
+                    )
+                
+                # 执行搜索
+                search_filter = Filter(must=filter_conditions) if filter_conditions else None
+                
+                results = self.client.search(
+                    collection_name=collection_name,
+                    query_vector=query_embedding.tolist(),
+                    query_filter=search_filter,
+                    search_params=self._search_params,
+                    limit=limit,
+                    with_payload=True
                 )
             
-            # 执行搜索
-            search_filter = Filter(must=filter_conditions) if filter_conditions else None
-            
-            results = self.client.search(
-                collection_name=collection_name,
-                query_vector=query_embedding.tolist(),
-                query_filter=search_filter,
-                limit=limit,
-                with_payload=True
-            )
-            
             # 更新访问次数
             self._update_access_counts(collection_name, [r.id for r in results])
             
@@ -526,24 +743,38 @@ class VectorStore:
             return []
     
     def _update_access_counts(self, collection_name: str, memory_ids: List[str]):
-        """更新记忆访问次数"""
+        """更新记忆访问次数（一次批量读取 + 一次批量写回，避免逐条往返；同一ID出现多次时累加多次）"""
+        if not memory_ids:
+            return
         try:
-            for memory_id in memory_ids:
-                # 获取当前记录
-                result = self.client.retrieve(
+            hit_counts = Counter(memory_ids)
+            # 一次性取回所有命中记录的当前计数
+            records = self.client.retrieve(
+                collection_name=collection_name,
+                ids=list(hit_counts),
+                with_payload=["access_count"],
+                with_vectors=False
+            )
+            if not records:
+                return
+            
+            # 所有更新合并为一个批量请求
+            operations = [
+                SetPayloadOperation(
+                    set_payload=SetPayload(
+                        payload={"access_count": (record.payload or {}).get("access_count", 0) + hit_counts[record.id]},
+                        points=[record.id]
+                    )
+                )
+                for record in records
+            ]
+            batch_size = VECTOR_DB_CONFIG.get("batch_size", 100)
+            for i in range(0, len(operations), batch_size):
+                self.client.batch_update_points(
                     collection_name=collection_name,
-                    ids=[memory_id],
-                    with_payload=True
+                    update_operations=operations[i:i+batch_size],
+                    wait=False
                 )
-                
-                if result:
-                    current_count = result[0].payload.get("access_count", 0)
-                    # 更新访问次数
-                    self.client.set_payload(
-                        collection_name=collection_name,
-                        points=[memory_id],
-                        payload={"access_count": current_count + 1}
-                    )
         except Exception as e:
             logger.debug(f"更新访问次数失败: {e}")
     
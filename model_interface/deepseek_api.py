@@ -1,7 +1,10 @@
 """DeepSeek API接口"""
 
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import time
+import threading
 import logging
 from typing import List, Dict, Any
 from config.settings import API_CONFIG
@@ -23,6 +26,21 @@ class DeepSeekAPI:
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        
+        # 复用HTTP连接（keep-alive），避免每次调用都重新建立TCP/TLS连接
+        # 连接池大小与调用方线程池规模相当
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # 可用性探测结果缓存：探测本身就是一次完整的API调用，不能每轮都做
+        self._available = False
+        self._available_checked_at = float('-inf')
+        self._available_ttl = 60.0          # 可用时的缓存时间（秒）
+        self._unavailable_ttl = 10.0        # 不可用时更快重试
+        self._available_lock = threading.Lock()
     
     def chat(self, 
              prompt: str, 
@@ -56,9 +74,8 @@ class DeepSeekAPI:
                     }
                     
                     timeout = 60 if attempt == 0 else 90  # 重试时增加超时
-                    response = requests.post(
+                    response = self.session.post(
                         f"{self.base_url}/v1/chat/completions",
-                        headers=self.headers,
                         json=data,
                         timeout=timeout
                     )
@@ -119,9 +136,8 @@ class DeepSeekAPI:
                 "temperature": temperature or API_CONFIG["deepseek"]["temperature"]
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/v1/chat/completions",
-                headers=self.headers,
                 json=data,
                 timeout=30
             )
@@ -137,15 +153,27 @@ class DeepSeekAPI:
             return f"API调用失败: {str(e)}"
     
     def is_available(self) -> bool:
-        """检查API是否可用"""
+        """检查API是否可用（结果按TTL缓存，多线程下只有一个线程实际探测）"""
         if not self.api_key:
             return False
         
-        try:
-            response = self.chat("测试", max_tokens=10)
-            return not response.startswith("API")  # 不是错误消息
-        except:
-            return False
+        ttl = self._available_ttl if self._available else self._unavailable_ttl
+        if time.monotonic() - self._available_checked_at < ttl:
+            return self._available
+        
+        with self._available_lock:
+            # 等锁期间其他线程可能已完成探测
+            ttl = self._available_ttl if self._available else self._unavailable_ttl
+            if time.monotonic() - self._available_checked_at < ttl:
+                return self._available
+            
+            try:
+                response = self.chat("测试", max_tokens=10)
+                self._available = not response.startswith("API")  # 不是错误消息
+            except:
+                self._available = False
+            self._available_checked_at = time.monotonic()
+            return self._available
 
 # 全局API实例
 _deepseek_api = None
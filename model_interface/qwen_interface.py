@@ -1,8 +1,16 @@
+import copy
+import threading
+from collections import OrderedDict
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
 from config.settings import MODEL_CONFIG
 import logging
 
+try:
+    from transformers import DynamicCache
+except ImportError:  # 旧版transformers不支持前缀KV缓存，退回完整推理
+    DynamicCache = None
+
 logger = logging.getLogger(__name__)
 
 class QwenInterface:
@@ -11,6 +19,10 @@ class QwenInterface:
         self.tokenizer = None
         self.device = "cuda"  # 强制CUDA
         self.quantized = False
+        # 固定前缀（Agent身份）的KV缓存：prefix -> (prefix_ids, past_key_values)
+        self._prefix_cache = OrderedDict()
+        self._prefix_cache_size = 32  # 每个Agent约2个前缀（身份前缀 + 角色个性描述）
+        self._prefix_lock = threading.Lock()
         self._load_model()
         
     def _load_model(self):
@@ -94,6 +106,75 @@ class QwenInterface:
             logger.error(f"GPU推理失败: {e}")
             return f"抱歉，AI系统暂时遇到了技术问题：{str(e)}"
     
+    def _get_prefix_cache(self, prefix: str):
+        """获取（必要时预填充）固定前缀的token与KV缓存"""
+        with self._prefix_lock:
+            cached = self._prefix_cache.get(prefix)
+            if cached is not None:
+                self._prefix_cache.move_to_end(prefix)
+                return cached
+            
+            prefix_ids = self.tokenizer(prefix, return_tensors="pt")['input_ids'].to('cuda')
+            with torch.no_grad():
+                prefix_kv = self.model(
+                    input_ids=prefix_ids, past_key_values=DynamicCache(), use_cache=True
+                ).past_key_values
+            
+            self._prefix_cache[prefix] = (prefix_ids, prefix_kv)
+            while len(self._prefix_cache) > self._prefix_cache_size:
+                self._prefix_cache.popitem(last=False)
+            return prefix_ids, prefix_kv
+    
+    def chat_with_prefix(self, prefix: str, suffix: str, max_tokens: int = None, temperature: float = 0.7) -> str:
+        """
+        带固定前缀的GPU推理：前缀只预填充一次并复用其KV缓存，每次只需处理变化的后缀
+        Args:
+            prefix: 跨调用不变的prompt前缀（如Agent身份）
+            suffix: 本次调用变化的部分
+        """
+        if DynamicCache is None:
+            return self.chat(prefix + suffix, max_tokens=max_tokens, temperature=temperature)
+        
+        try:
+            if max_tokens is None:
+                max_tokens = MODEL_CONFIG["default_max_tokens"]
+            
+            # 整体分词，保证输入与 chat(prefix + suffix) 完全一致；
+            # 前缀与后缀交界处的字符可能被合并成一个token，此时前缀的KV缓存不可复用
+            input_ids = self.tokenizer(prefix + suffix, return_tensors="pt")['input_ids'].to('cuda')
+            if input_ids.shape[1] > 1024:
+                # 超长时保持原有的截断行为
+                return self.chat(prefix + suffix, max_tokens=max_tokens, temperature=temperature)
+            
+            prefix_ids, prefix_kv = self._get_prefix_cache(prefix)
+            prefix_len = prefix_ids.shape[1]
+            if input_ids.shape[1] <= prefix_len or not torch.equal(input_ids[:, :prefix_len], prefix_ids):
+                return self.chat(prefix + suffix, max_tokens=max_tokens, temperature=temperature)
+            
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    input_ids=input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    past_key_values=copy.deepcopy(prefix_kv),  # generate会原地扩展缓存
+                    max_new_tokens=max_tokens,
+                    temperature=temperature,
+                    do_sample=True,
+                    top_p=0.8,
+                    repetition_penalty=1.1,
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    eos_token_id=self.tokenizer.eos_token_id
+                )
+            
+            response = self.tokenizer.decode(
+                outputs[0][input_ids.shape[1]:],
+                skip_special_tokens=True
+            )
+            return response.strip()
+            
+        except Exception as e:
+            logger.warning(f"前缀缓存推理失败，退回完整推理: {e}")
+            return self.chat(prefix + suffix, max_tokens=max_tokens, temperature=temperature)
+    
     def get_model_info(self) -> dict:
         """模型信息"""
         actual_device = str(next(self.model.parameters()).device) if self.model else "unknown"
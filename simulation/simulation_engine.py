@@ -27,12 +27,22 @@ PAT_MULTI_END = re.compile(r'[。!！?？]{2,}')
 PAT_QUOTES = re.compile(r'["“”‘’]+')
 PAT_DUP_WORD = re.compile(r'(\b\S{1,6}\b)(\s+\1){1,3}')
 PAT_ENGLISH_DETECT = re.compile(r'[a-zA-Z]{2,}')
+PAT_CORE_PUNCT = re.compile(r'[。！？，,.!\s]')
+PAT_HAS_CN = re.compile(r'[\u4e00-\u9fff]')
+PAT_LEADING_JUNK = re.compile(r'^[`´\'"，,。.!?！？:：;；\s]+')
+PAT_STYLE_LEAK = re.compile(r'句话.*(体现|风格|语气|能力)')
+PAT_CMP_STRIP = re.compile(r"[\s。！？!?,，；;\\.]+")
+PAT_END_PUNCT = re.compile(r'[。.!?！？]$')
 from datetime import datetime
 from display.terminal_colors import TerminalColors
-from collections import deque
+from collections import deque, OrderedDict
+from .interaction_utils import InteractionUtils
 
 logger = logging.getLogger(__name__)
 
+# 计入社交占比统计的行动类型
+_SOCIAL_ACTIONS = frozenset(('social', 'group_discussion'))
+
 class SimulationEngine:
     """模拟引擎"""
     
@@ -55,6 +65,7 @@ class SimulationEngine:
 
         # recent_actions 用于追踪最近的行动类型，防止讨论占比过高
         self.recent_actions = deque(maxlen=200)
+        self._recent_social_count = 0  # recent_actions 中社交类行动的数量，随追加/淘汰增量维护
         # 新增：防重复输出控制
         self._auto_hint_shown = False
         self._toggle_lock = threading.Lock()
@@ -64,6 +75,11 @@ class SimulationEngine:
         self._starting_simulation = False
         # A: 对话缓冲（pair -> deque[(speaker, text, ts)])
         self._pair_convo_buffers = {}
+        # 配对交流节流：pair -> 上次交流时间(monotonic)，按时间先后有序，便于从头部淘汰过期项
+        self._recent_interaction_lru = OrderedDict()
+        self._recent_interaction_ttl = 240
+        # 移动目的地：地点 -> 其它地点元组（建筑表在小镇创建时固定，这里一次算好）
+        self._other_locations = self._build_other_locations(buildings_ref() if buildings_ref else {})
         # === ALL 策略配置 ===
         self.cfg = {
             'feedback_probability': 0.1,          # 维持低反馈触发率，如需彻底关闭设为0.0
@@ -89,13 +105,12 @@ class SimulationEngine:
         try:
             if not text:
                 return
-            from collections import deque as _dq
             key = self._get_pair_key(a, b)
             buf = self._pair_convo_buffers.get(key)
             if buf is None:
-                buf = _dq(maxlen=10)
+                buf = deque(maxlen=10)
                 self._pair_convo_buffers[key] = buf
-            buf.append((speaker, text, time.time()))
+            buf.append((speaker, text, time.monotonic()))
         except Exception:
             pass
 
@@ -106,7 +121,7 @@ class SimulationEngine:
             buf = self._pair_convo_buffers.get(key)
             if not buf:
                 return ""
-            now = time.time()
+            now = time.monotonic()
             recent = [(spk, txt) for spk, txt, ts in list(buf)[-max_messages:] if now - ts <= max_age]
             if not recent:
                 return ""
@@ -161,19 +176,19 @@ class SimulationEngine:
             sentences = cleaned or sentences
             min_len, soft_max = length_range if length_range else (12, 30)
             result = sentences[0] if sentences else ''
-            core_before = PAT_MULTI_SPACE.sub('', re.sub(r'[。！？，,.!？\s]', '', result))
+            core_before = PAT_MULTI_SPACE.sub('', PAT_CORE_PUNCT.sub('', result))
             if len(core_before) < max(6, min_len - 4) and len(sentences) > 1:
                 addon = sentences[1]
-                addon_core = re.sub(r'[。！？，,.!？\s]', '', addon)
+                addon_core = PAT_CORE_PUNCT.sub('', addon)
                 if addon_core and addon_core != core_before:
                     joiner = '，' if not result.endswith(('，','。','!','！','?','？')) else ''
                     result = result.rstrip('。!?！？') + joiner + addon.strip('。!?！？')
-            if len(re.sub(r'[。！？，,.!？\s]', '', result)) < min_len and len(sentences) > 2:
+            if len(PAT_CORE_PUNCT.sub('', result)) < min_len and len(sentences) > 2:
                 third = sentences[2]
                 if third:
                     joiner = '，' if not result.endswith(('，','。','!','！','?','？')) else ''
                     result += joiner + third.strip('。!?！？')[:12]
-            if re.search(r'[\u4e00-\u9fff]', result):
+            if PAT_HAS_CN.search(result):
                 result = PAT_REMOVE_EN.sub('', result)
             for _ in range(2):
                 r2 = PAT_RENAME_PREFIX2.sub('', result).strip()
@@ -187,7 +202,7 @@ class SimulationEngine:
             result = PAT_QUOTES.sub('', result)
             result = PAT_DUP_WORD.sub(r'\1', result)
             # 去掉前导孤立符号/反引号
-            result = re.sub(r'^[`´\'"，,。.!?！？:：;；\s]+', '', result)
+            result = PAT_LEADING_JUNK.sub('', result)
             if len(result) > soft_max:
                 cut_pos = None
                 for m in re.finditer(r'[，,；;。.!?！？]', result):
@@ -201,13 +216,13 @@ class SimulationEngine:
                     result = result[:soft_max].rstrip('，,；;。.!?！？ ') + '…'
             if len(result) > max_len:
                 result = result[:max_len].rstrip('，,；;。.!?！？ ') + '…'
-            core_len = len(re.sub(r'[。！？，,.!？\s]', '', result))
+            core_len = len(PAT_CORE_PUNCT.sub('', result))
             if allow_short:
                 # 允许短：只要≥3个核心字就保留
                 if core_len < 3:
                     return ""
             else:
-                if (result in filler_set and core_len < 6) or re.search(r'句话.*(体现|风格|语气|能力)', result):
+                if (result in filler_set and core_len < 6) or PAT_STYLE_LEAK.search(result):
                     return ""
                 if core_len < max(4, min_len - 6):
                     return ""
@@ -323,19 +338,18 @@ class SimulationEngine:
 
         # 根据位置调整权重
         location = getattr(agent, 'location', '家')
-        if location in ['办公室', '修理店']:
+        if location in ('办公室', '修理店'):
             action_weights['work'] += 15
-        elif location in ['公园', '家']:
+        elif location in ('公园', '家'):
             action_weights['relax'] += 10
-        elif location in ['咖啡厅', '图书馆']:
+        elif location in ('咖啡厅', '图书馆'):
             action_weights['social'] += 10
 
         # 降低社交类行为的概率，如果最近历史中社交占比过高
         try:
             recent_len = len(self.recent_actions)
             if recent_len > 0:
-                social_count = sum(1 for a in self.recent_actions if a in ('social', 'group_discussion'))
-                social_ratio = social_count / recent_len
+                social_ratio = self._recent_social_count / recent_len
                 # 若最近社交占比超过阈值，则线性衰减社交权重（阈值可调整）
                 threshold = 0.35
                 if social_ratio > threshold:
@@ -363,30 +377,24 @@ class SimulationEngine:
         except Exception:
             pass
 
-        # 将原先构造扩展列表的 O(n) * weight 方式改为累积权重随机
-        total_weight = 0
-        filtered = {}
-        for k,v in action_weights.items():
-            if v > 0:
-                filtered[k] = v
-                total_weight += v
-        if total_weight <= 0:
+        # 加权随机选择（random.choices内部使用累积权重+二分查找）
+        actions = list(action_weights)
+        weights = [max(0, w) for w in action_weights.values()]
+        if sum(weights) <= 0:
             chosen_action = 'think'
         else:
-            r = random.uniform(0, total_weight)
-            upto = 0
-            chosen_action = 'think'
-            for action, w in filtered.items():
-                if upto + w >= r:
-                    chosen_action = action
-                    break
-                upto += w
+            chosen_action = random.choices(actions, weights=weights, k=1)[0]
 
         # 记录Agent的最近行动
         self.last_actions[agent_name] = chosen_action
         # 记录到全局 recent_actions，用于全局频率控制
         try:
-            self.recent_actions.append(chosen_action)
+            recent = self.recent_actions
+            if len(recent) == recent.maxlen and recent[0] in _SOCIAL_ACTIONS:
+                self._recent_social_count -= 1  # 最旧的一条即将被淘汰
+            if chosen_action in _SOCIAL_ACTIONS:
+                self._recent_social_count += 1
+            recent.append(chosen_action)
         except Exception:
             pass
 
@@ -446,7 +454,7 @@ class SimulationEngine:
             
             # 思考后可能更新Agent状态
             if hasattr(agent, 'update_status'):
-                self.thread_manager.submit_task(agent.update_status)
+                self.thread_manager.submit_background_task(agent.update_status)
             
             return True
             
@@ -487,7 +495,7 @@ class SimulationEngine:
                     elif hasattr(agent, 'energy'):
                         agent.energy = min(100, agent.energy + random.randint(5, 15))
             
-            self.thread_manager.submit_task(update_energy)
+            self.thread_manager.submit_background_task(update_energy)
             return True
             
         except Exception as e:
@@ -518,7 +526,7 @@ class SimulationEngine:
                     elif hasattr(agent, 'energy'):
                         agent.energy = min(100, agent.energy + random.randint(10, 20))
             
-            self.thread_manager.submit_task(update_wellness)
+            self.thread_manager.submit_background_task(update_wellness)
             return True
             
         except Exception as e:
@@ -559,11 +567,9 @@ class SimulationEngine:
     def _execute_social_interaction(self, agent1, agent1_name: str, agent2, agent2_name: str, location: str) -> bool:
         """执行社交互动的核心逻辑 (精简指令/批量打印/上下文裁剪=2)"""
         try:
-            if not hasattr(self, '_recent_interaction_lru'):
-                self._recent_interaction_lru = {}
-            now_ts = time.time()
+            now_ts = time.monotonic()
             key = tuple(sorted([agent1_name, agent2_name]))
-            last_ts = self._recent_interaction_lru.get(key, 0)
+            last_ts = self._recent_interaction_lru.get(key, float('-inf'))
             # 节流 使用配置
             if now_ts - last_ts < self.cfg['pair_throttle_seconds']:
                 return False
@@ -604,7 +610,7 @@ class SimulationEngine:
                 raw_topic = agent1.think_and_respond(topic_prompt_base)
                 topic = self._sanitize_dialog_reply(raw_topic, length_range=len_range, max_len=80)
                 def _too_short(t: str) -> bool:
-                    core = re.sub(r'[。！？，,.!？\s]','', t)
+                    core = PAT_CORE_PUNCT.sub('', t)
                     return len(core) < 3 or core in (agent1_name, agent2_name)
                 if _too_short(topic):
                     raw_topic_2 = agent1.think_and_respond(topic_prompt_base + " 更具体,带细节或情绪线索。")
@@ -628,12 +634,12 @@ class SimulationEngine:
                 interaction_type = self._choose_interaction_type(current_relationship)
                 response = self._generate_agent_response(agent2, agent2_name, agent1_name, topic, interaction_type, pair_context=pair_context, length_range=len_range)
                 response = self._sanitize_dialog_reply(response, length_range=len_range, max_len=85)
-                if self.cfg['enrich_enabled'] and len(re.sub(r'[。！？，,.!？\s]','', response)) < max(self.cfg['enrich_min_core'], len_range[0]-5):
+                if self.cfg['enrich_enabled'] and len(PAT_CORE_PUNCT.sub('', response)) < max(self.cfg['enrich_min_core'], len_range[0]-5):
                     enrich_prompt = f"针对'{topic}' 输出更具体自然回应 (可补短分句,{len_range[0]}~{len_range[1]}字):"
                     try:
                         rich = agent2.think_and_respond(enrich_prompt)
                         rich_clean = self._sanitize_dialog_reply(rich, length_range=len_range, max_len=85)
-                        if len(re.sub(r'[。！？，,.!？\s]','', rich_clean)) >= len_range[0]-4:
+                        if len(PAT_CORE_PUNCT.sub('', rich_clean)) >= len_range[0]-4:
                             response = rich_clean
                     except Exception:
                         pass
@@ -658,7 +664,7 @@ class SimulationEngine:
                     future = self.thread_manager.submit_task(_gen_fb)
                     try:
                         fb_clean = future.result(timeout=self.cfg['feedback_async_timeout'])
-                        if len(re.sub(r'[。！？，,.!？\s]','', fb_clean)) >= 6:
+                        if len(PAT_CORE_PUNCT.sub('', fb_clean)) >= 6:
                             feedback = fb_clean
                     except Exception:
                         feedback = None
@@ -682,16 +688,16 @@ class SimulationEngine:
                     new_strength = self.behavior_manager.get_relationship_strength(agent1_name, agent2_name)
                     if bias != 0 and hasattr(self.behavior_manager, 'social_network'):
                         ns = max(0, min(100, new_strength + bias))
-                        self.behavior_manager.social_network[agent1_name][agent2_name] = ns
-                        self.behavior_manager.social_network[agent2_name][agent1_name] = ns
+                        self.behavior_manager.set_relationship_strength(agent1_name, agent2_name, ns)
                         delta = ns - prev_strength
                         if delta != 0:
                             lines.append(f"  🔗 关系调整: {agent1_name} ↔ {agent2_name} {prev_strength} → {ns} (偏置 {bias:+d})")
-                self._recent_interaction_lru[key] = now_ts
-                if len(self._recent_interaction_lru) > 300 and random.random() < 0.15:
-                    to_del = [k for k,v in self._recent_interaction_lru.items() if now_ts - v > 240]
-                    for k in to_del:
-                        self._recent_interaction_lru.pop(k, None)
+                lru = self._recent_interaction_lru
+                lru[key] = now_ts
+                lru.move_to_end(key)
+                # 头部即最早的记录，只需弹出已过期的部分
+                while lru and now_ts - next(iter(lru.values())) > self._recent_interaction_ttl:
+                    lru.popitem(last=False)
                 with self.print_lock:
                     print('\n'.join(lines) + '\n')
                 return True
@@ -740,13 +746,11 @@ class SimulationEngine:
     
     def _choose_interaction_type(self, relationship_strength: int) -> str:
         """根据关系强度选择互动类型 - 委托给工具类"""
-        from .interaction_utils import InteractionUtils
         return InteractionUtils.choose_interaction_type(relationship_strength)
     
     def _generate_agent_response(self, agent, agent_name: str, other_name: str, topic: str, interaction_type: str, pair_context: str = None, length_range=None) -> str:
         # 精简提示，去冗余“请/不要”多组合
         try:
-            from .interaction_utils import InteractionUtils
             base_prompt = InteractionUtils.generate_interaction_prompt(agent_name, other_name, topic, interaction_type)
             ctx_part = f"最近对话:\n{pair_context}\n" if pair_context else ""
             if length_range:
@@ -766,8 +770,8 @@ class SimulationEngine:
                     if attempt < max_retries:
                         prompt += " 仅中文。"
                         continue
-                cmp_resp = re.sub(r"[\s。！？!?,，；;\\.]+", "", (response or "")).strip()
-                cmp_topic = re.sub(r"[\s。！？!?,，；;\\.]+", "", (topic or "")).strip()
+                cmp_resp = PAT_CMP_STRIP.sub("", (response or "")).strip()
+                cmp_topic = PAT_CMP_STRIP.sub("", (topic or "")).strip()
                 if not response:
                     if attempt < max_retries:
                         prompt += " 不要留空。"
@@ -887,7 +891,7 @@ class SimulationEngine:
             core = parts[0]
             if len(core) < 12 and len(parts) > 1 and len(parts[1]) < 10:
                 core += parts[1]
-            if re.search(r'[\u4e00-\u9fff]', core):
+            if PAT_HAS_CN.search(core):
                 core = PAT_REMOVE_EN.sub('', core)
             core = PAT_DUP_WORD.sub(r'\1', core)
             core = PAT_MULTI_SPACE.sub(' ', core).strip()
@@ -895,7 +899,7 @@ class SimulationEngine:
             core = PAT_MULTI_END.sub('。', core)
             if len(core) > max_len:
                 core = core[:max_len].rstrip('，,。.!?！？;； ') + '…'
-            if not re.search(r'[。.!?！？]$', core) and len(core) < max_len:
+            if not PAT_END_PUNCT.search(core) and len(core) < max_len:
                 core += '。'
             return core
         except Exception:
@@ -933,12 +937,12 @@ class SimulationEngine:
             except Exception:
                 raw_topic = "今天天气有点影响心情。"
             topic = self._sanitize_reply(self.clean_response(raw_topic), max_len=60)
-            core_topic = re.sub(r'[。！？，,.!\s]','', topic)
+            core_topic = PAT_CORE_PUNCT.sub('', topic)
             if len(core_topic) < 4:
                 try:
                     raw_topic2 = agent.think_and_respond(topic_prompt + " 更具体一点,含细节。")
                     topic2 = self._sanitize_reply(self.clean_response(raw_topic2), max_len=60)
-                    if len(re.sub(r'[。！？，,.!\s]','', topic2)) >= 4:
+                    if len(PAT_CORE_PUNCT.sub('', topic2)) >= 4:
                         topic = topic2
                 except Exception:
                     pass
@@ -955,12 +959,12 @@ class SimulationEngine:
                 except Exception:
                     raw = "我也在想这个。"
                 cleaned = self._sanitize_reply(self.clean_response(raw), max_len=70)
-                core = re.sub(r'[。！？，,.!\s]','', cleaned)
+                core = PAT_CORE_PUNCT.sub('', cleaned)
                 if len(core) < 6:
                     try:
                         raw2 = pagent.think_and_respond(base_prompt + " 更具体一点。")
                         cleaned2 = self._sanitize_reply(self.clean_response(raw2), max_len=70)
-                        if len(re.sub(r'[。！？，,.!\s]','', cleaned2)) >= 6:
+                        if len(PAT_CORE_PUNCT.sub('', cleaned2)) >= 6:
                             return cleaned2
                     except Exception:
                         pass
@@ -980,12 +984,12 @@ class SimulationEngine:
                     feedback = self._sanitize_reply(self.clean_response(raw_fb), max_len=60)
                 except Exception:
                     feedback = "听起来可以。"
-                fb_core = re.sub(r'[。！？，,.!？\s]','', feedback)
+                fb_core = PAT_CORE_PUNCT.sub('', feedback)
                 if len(fb_core) < 4:
                     try:
                         raw_fb2 = agent.think_and_respond(fb_prompt + " 更具体些。")
                         feedback2 = self._sanitize_reply(self.clean_response(raw_fb2), max_len=60)
-                        if len(re.sub(r'[。！？，,.!？\s]','', feedback2)) >= 4:
+                        if len(PAT_CORE_PUNCT.sub('', feedback2)) >= 4:
                             feedback = feedback2
                     except Exception:
                         pass
@@ -993,11 +997,8 @@ class SimulationEngine:
                 convo.append((agent_name, feedback))
                 pending_rel_updates.append((agent_name, pname))
             print('\n' + '\n'.join(output_lines) + '\n')
-            for a1, a2 in pending_rel_updates:
-                try:
-                    self._update_relationship(a1, a2, 'group_discussion', current_location)
-                except Exception:
-                    pass
+            if pending_rel_updates:
+                self._update_relationships_batch(pending_rel_updates, 'group_discussion', current_location)
             return True
         except Exception as e:
             logger.error(f"群体讨论异常: {e}")
@@ -1065,6 +1066,12 @@ class SimulationEngine:
             logger.error(f"模拟步骤执行异常: {e}")
             return False
     
+    @staticmethod
+    def _build_other_locations(buildings: dict) -> dict:
+        """预先算好每个地点之外的可选目的地"""
+        locations = tuple(buildings)
+        return {loc: tuple(other for other in locations if other != loc) for loc in locations}
+    
     def _execute_move_action_safe(self, agent, agent_name: str, buildings: dict) -> bool:
         """安全执行移动行动"""
         # 增加移动事件采样（短时间重复移动不入库）
@@ -1072,7 +1079,10 @@ class SimulationEngine:
             if not hasattr(self, '_recent_move_ts'):
                 self._recent_move_ts = {}
             current_location = getattr(agent, 'location', '家')
-            available_locations = [loc for loc in buildings.keys() if loc != current_location]
+            available_locations = self._other_locations.get(current_location)
+            if available_locations is None:
+                # 当前地点不在预先算好的建筑表中，按当前建筑表现算
+                available_locations = [loc for loc in buildings if loc != current_location]
             if not available_locations:
                 return False
             new_location = random.choice(available_locations)
@@ -1085,8 +1095,8 @@ class SimulationEngine:
                     with self.print_lock:
                         print(f"\n{TerminalColors.BOLD}━━━ 🚶 移动 ━━━{TerminalColors.END}")
                         print(f"  {agent.emoji} {TerminalColors.MAGENTA}{agent_name}{TerminalColors.END}: {current_location} → {new_location}\n")
-                    last_move = self._recent_move_ts.get(agent_name, 0)
-                    now_ts = time.time()
+                    last_move = self._recent_move_ts.get(agent_name, float('-inf'))
+                    now_ts = time.monotonic()
                     # 只有超过 20 秒或位置真正变化才写入
                     if now_ts - last_move > 20 and new_location != current_location:
                         movement_task = {
@@ -1110,7 +1120,6 @@ class SimulationEngine:
     def _get_interaction_color(self, interaction_type: str) -> str:
         """获取互动类型对应的显示颜色 - 委托给工具类"""
         try:
-            from .interaction_utils import InteractionUtils
             return InteractionUtils.get_interaction_color(interaction_type)
         except Exception:
             # 如果工具不可用，返回默认终端颜色
@@ -1155,6 +1164,38 @@ class SimulationEngine:
             logger.error(f"更新关系失败: {e}")
             # 不抛出异常，避免中断模拟流程
 
+    def _update_relationships_batch(self, pairs: list, interaction_type: str, location: str):
+        """批量更新多对Agent的关系（整批只加一次社交锁）并异步保存交互记录"""
+        try:
+            if not self.behavior_manager:
+                logger.warning("behavior_manager不可用，跳过关系更新")
+                return
+            
+            timestamp = datetime.now().isoformat()
+            interactions = [{
+                'agent1_name': agent1_name,
+                'agent2_name': agent2_name,
+                'interaction_type': interaction_type,
+                'context': {
+                    'location': location,
+                    'timestamp': timestamp
+                }
+            } for agent1_name, agent2_name in pairs]
+            
+            if hasattr(self.thread_manager, 'safe_social_update_batch'):
+                self.thread_manager.safe_social_update_batch(
+                    self.behavior_manager,
+                    [(data['agent1_name'], data['agent2_name'], interaction_type, data['context'])
+                     for data in interactions]
+                )
+            
+            if hasattr(self.thread_manager, 'add_memory_task'):
+                for data in interactions:
+                    self.thread_manager.add_memory_task({'type': 'interaction', 'data': data})
+        except Exception as e:
+            logger.error(f"批量更新关系失败: {e}")
+            # 不抛出异常，避免中断模拟流程
+    
     def _choose_feedback_template(self, rel: int) -> str:
         """根据关系强度选取反馈模板 (缺失补全)"""
         templates = [
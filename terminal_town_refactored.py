@@ -27,12 +27,16 @@ from simulation.simulation_engine import SimulationEngine
 from memory.memory_cleaner import get_memory_cleaner
 from memory.vector_optimizer import get_vector_optimizer
 from agents.behavior_manager import behavior_manager
+from agents.base_agent import shutdown_memory_executor
 from setup_logging import setup_logging
 
 # 设置日志
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# 事件生成用的随机数生成器
+_RNG = random.Random()
+
 class TerminalTownRefactored:
    
     
@@ -40,14 +44,14 @@ class TerminalTownRefactored:
         # 基础数据结构
         self.agents = {}
         self.buildings = {
-            '咖啡厅': {'x': 1, 'y': 3, 'emoji': '☕', 'occupants': []},
-            '图书馆': {'x': 4, 'y': 3, 'emoji': '📚', 'occupants': []},
-            '公园': {'x': 2, 'y': 1, 'emoji': '🌳', 'occupants': []},
-            '办公室': {'x': 5, 'y': 1, 'emoji': '💼', 'occupants': []},
-            '家': {'x': 3, 'y': 5, 'emoji': '🏠', 'occupants': []},
-            '医院': {'x': 0, 'y': 2, 'emoji': '🏥', 'occupants': []},
-            '餐厅': {'x': 5, 'y': 4, 'emoji': '🍽️', 'occupants': []},
-            '修理店': {'x': 1, 'y': 0, 'emoji': '🔧', 'occupants': []}
+            '咖啡厅': {'x': 1, 'y': 3, 'emoji': '☕', 'occupants': set()},
+            '图书馆': {'x': 4, 'y': 3, 'emoji': '📚', 'occupants': set()},
+            '公园': {'x': 2, 'y': 1, 'emoji': '🌳', 'occupants': set()},
+            '办公室': {'x': 5, 'y': 1, 'emoji': '💼', 'occupants': set()},
+            '家': {'x': 3, 'y': 5, 'emoji': '🏠', 'occupants': set()},
+            '医院': {'x': 0, 'y': 2, 'emoji': '🏥', 'occupants': set()},
+            '餐厅': {'x': 5, 'y': 4, 'emoji': '🍽️', 'occupants': set()},
+            '修理店': {'x': 1, 'y': 0, 'emoji': '🔧', 'occupants': set()}
         }
         self.chat_history = []
         
@@ -336,21 +340,22 @@ class TerminalTownRefactored:
         self.simulation_engine.toggle_auto_simulation()
     
     def _process_memory_save_batch(self, tasks: List[dict]):
-        """批量处理内存保存任务"""
+        """批量处理内存保存任务
+        只在MemoryWorker线程中调用。Agent自身的记忆另由记忆线程池（BaseAgent._add_memories_async）写入向量库，
+        原来的向量数据库锁只有这里使用、并不能与那条写入路径互斥，因此整批嵌入+写库不再持锁"""
         try:
-            with self.thread_manager.vector_db_lock:
-                for task in tasks:
-                    if task['type'] == 'user_chat':
-                        self._save_user_chat_to_vector_db(
-                            task['agent_name'],
-                            task['user_message'], 
-                            task['agent_response']
-                        )
-                    elif task['type'] == 'interaction':
-                        self._save_interaction_to_vector_db(**task['data'])
-                    elif task['type'] == 'movement':
-                        self._save_movement_to_vector_db(**task)
-                        
+            for task in tasks:
+                if task['type'] == 'user_chat':
+                    self._save_user_chat_to_vector_db(
+                        task['agent_name'],
+                        task['user_message'], 
+                        task['agent_response']
+                    )
+                elif task['type'] == 'interaction':
+                    self._save_interaction_to_vector_db(**task['data'])
+                elif task['type'] == 'movement':
+                    self._save_movement_to_vector_db(**task)
+                    
         except Exception as e:
             logger.error(f"批量保存内存任务失败: {e}")
     
@@ -376,12 +381,13 @@ class TerminalTownRefactored:
             
             # 定期保存社交网络数据
             if not hasattr(self, '_last_social_save_time'):
-                self._last_social_save_time = time.time()
+                self._last_social_save_time = time.monotonic()
             
             # 每5分钟保存一次社交网络数据
-            current_time = time.time()
+            current_time = time.monotonic()
             if current_time - self._last_social_save_time > 300:  # 5分钟 = 300秒
-                self.behavior_manager.save_social_network_to_file()
+                # 只有关系发生过变化才真正写文件
+                self.behavior_manager.flush_social_network()
                 self._last_social_save_time = current_time
                 logger.debug("🗄️ 定期保存社交网络数据完成")
             
@@ -689,7 +695,7 @@ class TerminalTownRefactored:
         try:
             for name, data in buildings_data.items():
                 if name in self.buildings:
-                    self.buildings[name]['occupants'] = data.get('occupants', [])
+                    self.buildings[name]['occupants'] = set(data.get('occupants', []))
             
             logger.info("建筑物状态恢复完成")
             
@@ -1387,15 +1393,14 @@ class TerminalTownRefactored:
     
     def _create_meeting_event(self):
         """创建聚会事件"""
-        import random
         # 随机选择地点
         locations = ['咖啡厅', '公园', '图书馆']
-        location = random.choice(locations)
+        location = _RNG.choice(locations)
         
         # 移动部分Agent到聚会地点
         available_agents = list(self.agents.keys())
         if len(available_agents) >= 2:
-            selected_agents = random.sample(available_agents, min(3, len(available_agents)))
+            selected_agents = _RNG.sample(available_agents, min(3, len(available_agents)))
             for agent_name in selected_agents:
                 self.move_agent(agent_name, location)
             
@@ -1404,12 +1409,10 @@ class TerminalTownRefactored:
     
     def _create_conflict_event(self):
         """创建冲突事件"""
-        import random
-        
         agents = list(self.agents.keys())
         if len(agents) >= 2:
             # 随机选择两个Agent
-            agent1, agent2 = random.sample(agents, 2)
+            agent1, agent2 = _RNG.sample(agents, 2)
             
             # 获取当前关系值
             current_relationship = self.behavior_manager.get_relationship_strength(agent1, agent2)
@@ -1420,7 +1423,7 @@ class TerminalTownRefactored:
                 '对小镇发展的不同看法',
                 '生活理念的差异'
             ]
-            topic = random.choice(conflict_topics)
+            topic = _RNG.choice(conflict_topics)
             
             print(f"⚔️ 冲突事件发生!")
             print(f"👥 冲突双方: {agent1} vs {agent2}")
@@ -1441,10 +1444,9 @@ class TerminalTownRefactored:
     
     def _create_celebration_event(self):
         """创建庆祝事件"""
-        import random
         # 创建积极的社区事件
         celebration_types = ['生日派对', '工作成功庆祝', '友谊纪念', '技能展示']
-        celebration = random.choice(celebration_types)
+        celebration = _RNG.choice(celebration_types)
         
         # 提升所有Agent的心情
         for agent in self.agents.values():
@@ -1457,7 +1459,6 @@ class TerminalTownRefactored:
     
     def _create_custom_event(self):
         """创建自定义事件"""
-        import random
         events = [
             "小镇来了新居民",
             "天气特别好，大家都想出门",
@@ -1465,7 +1466,7 @@ class TerminalTownRefactored:
             "咖啡厅推出新口味咖啡",
             "公园里发现了有趣的东西"
         ]
-        event = random.choice(events)
+        event = _RNG.choice(events)
         print(f"✨ 事件: {event}")
     
     def clear_event_history(self):
@@ -1504,6 +1505,11 @@ class TerminalTownRefactored:
                 self.persistence_manager.save_system_state(quick_data, quick_mode=True)
             except Exception as e:
                 logger.warning(f"快速保存失败: {e}")
+            try:
+                # 等待尚未写入的Agent记忆落库
+                shutdown_memory_executor(wait=True)
+            except Exception as e:
+                logger.warning(f"关闭记忆写入线程池失败: {e}")
             components_to_close = [
                 ('smart_cleanup_manager', 2.0),
                 ('memory_cleaner', 2.0),